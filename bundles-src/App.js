@@ -101,29 +101,30 @@ class App extends Component {
   }
 
 
-  async getProducts(){
-    let response = await fetch('/api/products/', {
-      headers: {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json',
-      }
-    });
-
-    if (!response.ok){
-      return;
+  loadCachedBootstrap(){
+    try {
+      return JSON.parse(localStorage.getItem('bootstrap'));
+    } catch (error) {
+      return null;
     }
-
-    let data = await response.json();
-    this.setState({
-      products : data
-    });
   }
 
-  async getBanners(){
-    let response = await fetch('/api/banners/', {
+  async getBootstrap(){
+    let cachedBootstrap = this.loadCachedBootstrap();
+    if (cachedBootstrap){
+      this.setState({
+        products: cachedBootstrap.products,
+        banners: cachedBootstrap.banners,
+      });
+    }
+
+    let url = '/api/bootstrap/';
+    if (cachedBootstrap){
+      url += '?version=' + encodeURIComponent(cachedBootstrap.version);
+    }
+    let response = await fetch(url, {
       headers: {
         'Accept': 'application/json',
-        'Content-Type': 'application/json',
       }
     });
 
@@ -133,13 +134,18 @@ class App extends Component {
 
     let data = await response.json();
     this.setState({
-      banners : data
+      products: data.products,
+      banners: data.banners,
     });
+    try {
+      localStorage.setItem('bootstrap', JSON.stringify(data));
+    } catch (error) {
+      // storage is full or disabled, the data will be fetched again next time
+    }
   }
 
   componentDidMount(){
-    this.getProducts();
-    this.getBanners();
+    this.getBootstrap();
   }
 
 
@@ -39,13 +39,18 @@ class Product extends Component{
 
   render(){
     let image = this.props.product.image;
+    let imageSrcset = this.props.product.image_srcset || undefined;
+    let imageWebpSrcset = this.props.product.image_webp_srcset;
     let name = this.props.product.name;
     let price = this.props.product.price;
     let id = this.props.product.id;
     return (
       <div className="product">
         <div className="product-image">
-          <img src={image} alt={name} onClick={this.quickView.bind(this)}/>
+          <picture>
+            {imageWebpSrcset && <source type="image/webp" srcSet={imageWebpSrcset} sizes="250px"/>}
+            <img src={image} srcSet={imageSrcset} sizes="250px" alt={name} onClick={this.quickView.bind(this)}/>
+          </picture>
         </div>
         <h4 className="product-name">{name}</h4>
         <p className="product-price currency">{price}</p>
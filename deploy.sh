@@ -7,6 +7,7 @@ echo "setup environment and git pull"
 cd $BASE_DIR
 source venv/bin/activate
 git pull
+echo "{\"branch\": \"$(git rev-parse --abbrev-ref HEAD)\", \"revision\": \"$(git rev-parse --short HEAD)\"}" > build_info.json
 
 echo "install requirements for python and js"
 pip install -r requirements.txt
@@ -16,8 +17,13 @@ echo "build static and js"
 parcel build bundles-src/index.js --dist-dir bundles --public-url="./"
 python manage.py collectstatic --noinput
 
+echo "check production settings"
+python manage.py check --deploy --fail-level ERROR
+
 echo "make migrations"
 python manage.py migrate --noinput
+python manage.py refresh_order_candidates
+python manage.py generate_image_derivatives
 
 echo "prepare systemd services"
 systemctl restart star-burger.service
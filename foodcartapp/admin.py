@@ -1,11 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.http import HttpResponseRedirect
 from django.shortcuts import reverse
-from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.http import url_has_allowed_host_and_scheme
 
-from .models import Product, Order, OrderItem
+from .images import get_image_urls
+from .models import Banner, Product, Order, OrderItem
 from .models import ProductCategory
 from .models import Restaurant
 from .models import RestaurantMenuItem
@@ -16,6 +16,10 @@ class RestaurantMenuItemInline(admin.TabularInline):
     extra = 0
 
 
+def report_availability_change(modeladmin, request, updated_count):
+    modeladmin.message_user(request, f'Обновлено пунктов меню: {updated_count}', messages.SUCCESS)
+
+
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     search_fields = [
@@ -31,6 +35,20 @@ class RestaurantAdmin(admin.ModelAdmin):
     inlines = [
         RestaurantMenuItemInline
     ]
+    actions = [
+        'open_menu',
+        'close_menu',
+    ]
+
+    def open_menu(self, request, queryset):
+        updated_count = RestaurantMenuItem.objects.filter(restaurant__in=queryset).set_availability(True)
+        report_availability_change(self, request, updated_count)
+    open_menu.short_description = 'Вернуть в продажу всё меню'
+
+    def close_menu(self, request, queryset):
+        updated_count = RestaurantMenuItem.objects.filter(restaurant__in=queryset).set_availability(False)
+        report_availability_change(self, request, updated_count)
+    close_menu.short_description = 'Снять с продажи всё меню'
 
 
 @admin.register(Product)
@@ -57,6 +75,10 @@ class ProductAdmin(admin.ModelAdmin):
     inlines = [
         RestaurantMenuItemInline
     ]
+    actions = [
+        'make_available',
+        'make_unavailable',
+    ]
     fieldsets = (
         ('Общее', {
             'fields': [
@@ -85,23 +107,39 @@ class ProductAdmin(admin.ModelAdmin):
     class Media:
         css = {
             "all": (
-                static("admin/foodcartapp.css")
+                "admin/foodcartapp.css",
             )
         }
 
     def get_image_preview(self, obj):
         if not obj.image:
             return 'выберите картинку'
-        return format_html('<img src="{url}" style="max-height: 200px;"/>', url=obj.image.url)
+        image_urls = get_image_urls(obj.image.name, obj.image_derivatives)
+        return format_html(
+            '<img src="{url}" srcset="{srcset}" sizes="200px" style="max-height: 200px;"/>',
+            url=obj.image.url,
+            srcset=image_urls['srcset'],
+        )
     get_image_preview.short_description = 'превью'
 
     def get_image_list_preview(self, obj):
         if not obj.image or not obj.id:
             return 'нет картинки'
         edit_url = reverse('admin:foodcartapp_product_change', args=(obj.id,))
-        return format_html('<a href="{edit_url}"><img src="{src}" style="max-height: 50px;"/></a>', edit_url=edit_url, src=obj.image.url)
+        image_urls = get_image_urls(obj.image.name, obj.image_derivatives)
+        return format_html('<a href="{edit_url}"><img src="{src}" style="max-height: 50px;"/></a>', edit_url=edit_url, src=image_urls['thumb'])
     get_image_list_preview.short_description = 'превью'
 
+    def make_available(self, request, queryset):
+        updated_count = RestaurantMenuItem.objects.filter(product__in=queryset).set_availability(True)
+        report_availability_change(self, request, updated_count)
+    make_available.short_description = 'Вернуть в продажу во всех ресторанах'
+
+    def make_unavailable(self, request, queryset):
+        updated_count = RestaurantMenuItem.objects.filter(product__in=queryset).set_availability(False)
+        report_availability_change(self, request, updated_count)
+    make_unavailable.short_description = 'Снять с продажи во всех ресторанах'
+
 
 @admin.register(ProductCategory)
 class ProductAdmin(admin.ModelAdmin):
@@ -117,6 +155,7 @@ class OrderItemInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['get_fullname', 'address']
     list_filter = ['created_at']
+    readonly_fields = ['total_price']
     inlines = [OrderItemInline, ]
 
     def get_fullname(self, obj):
@@ -130,3 +169,21 @@ class OrderAdmin(admin.ModelAdmin):
                 return HttpResponseRedirect(request.GET['next'])
             return res
         return res
+
+
+@admin.register(Banner)
+class BannerAdmin(admin.ModelAdmin):
+    list_display = [
+        'title',
+        'order',
+        'is_active',
+        'active_from',
+        'active_until',
+    ]
+    list_editable = [
+        'order',
+        'is_active',
+    ]
+    list_filter = [
+        'is_active',
+    ]
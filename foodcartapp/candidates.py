@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+
+from geo_places.distances import calc_distance_matrix
+from geo_places.geocoder import lookup_addresses
+from geo_places.models import Address
+
+from .models import Order, OrderItem, OrderRestaurantCandidate, ProductAvailabilityIndex, Restaurant
+from .signals import orders_changed
+
+
+def get_resolved_titles(titles, addresses):
+    return [
+        title for title in titles
+        if title in addresses and addresses[title].is_resolved
+    ]
+
+
+@transaction.atomic
+def refresh_order_candidates(orders):
+    order_ids = list(orders.values_list('id', flat=True))
+    if not order_ids:
+        return 0
+    transaction.on_commit(lambda: orders_changed.send(sender=Order, order_ids=order_ids))
+
+    OrderRestaurantCandidate.objects.filter(order__in=orders).exclude(order__status='waiting').delete()
+    orders = list(orders.filter(status='waiting').only('id', 'address'))
+    if not orders:
+        return 0
+
+    order_product_ids = {}
+    order_items = OrderItem.objects.filter(order__in=orders).values_list('order_id', 'product_id')
+    for order_id, product_id in order_items:
+        order_product_ids.setdefault(order_id, set()).add(product_id)
+
+    availability_index = ProductAvailabilityIndex.build(
+        product_ids={product_id for product_ids in order_product_ids.values() for product_id in product_ids}
+    )
+    restaurants = Restaurant.objects.only('id', 'address').in_bulk()
+
+    order_addresses = {order.address for order in orders}
+    restaurant_addresses = {restaurant.address for restaurant in restaurants.values() if restaurant.address}
+    addresses = lookup_addresses(order_addresses | restaurant_addresses)
+
+    resolved_order_addresses = get_resolved_titles(order_addresses, addresses)
+    resolved_restaurant_addresses = get_resolved_titles(restaurant_addresses, addresses)
+    distances = calc_distance_matrix(
+        [(addresses[title].lat, addresses[title].lon) for title in resolved_order_addresses],
+        [(addresses[title].lat, addresses[title].lon) for title in resolved_restaurant_addresses],
+        mode=settings.DISTANCE_MODE,
+    )
+    order_rows = {title: row for row, title in enumerate(resolved_order_addresses)}
+    restaurant_columns = {title: column for column, title in enumerate(resolved_restaurant_addresses)}
+
+    candidates = []
+    for order in orders:
+        order_row = order_rows.get(order.address)
+        restaurant_ids = availability_index.get_restaurants(order_product_ids.get(order.id, []))
+
+        for restaurant_id in restaurant_ids:
+            restaurant_column = restaurant_columns.get(restaurants[restaurant_id].address)
+
+            distance = None
+            if order_row is not None and restaurant_column is not None:
+                distance = round(float(distances[order_row, restaurant_column]), 2)
+
+            candidates.append(OrderRestaurantCandidate(
+                order_id=order.id,
+                restaurant_id=restaurant_id,
+                distance=distance,
+            ))
+
+    OrderRestaurantCandidate.objects.filter(order__in=orders).delete()
+    OrderRestaurantCandidate.objects.bulk_create(candidates, batch_size=1000)
+    return len(orders)
+
+
+def refresh_orders_with_addresses(address_keys):
+    waiting_orders = Order.objects.filter(status='waiting').values_list('id', 'address')
+    order_ids = [
+        order_id for order_id, address in waiting_orders
+        if Address.normalize_title(address) in address_keys
+    ]
+    return refresh_order_candidates(Order.objects.filter(id__in=order_ids))
+
+
+@transaction.atomic
+def refresh_restaurant_candidates(restaurant_ids):
+    candidates = list(
+        OrderRestaurantCandidate.objects.filter(restaurant_id__in=restaurant_ids, order__status='waiting')
+        .select_related('order', 'restaurant')
+        .only('id', 'distance', 'order__address', 'restaurant__address')
+    )
+    if not candidates:
+        return 0
+
+    order_addresses = {candidate.order.address for candidate in candidates}
+    restaurant_addresses = {candidate.restaurant.address for candidate in candidates if candidate.restaurant.address}
+    addresses = lookup_addresses(order_addresses | restaurant_addresses)
+
+    resolved_order_addresses = get_resolved_titles(order_addresses, addresses)
+    resolved_restaurant_addresses = get_resolved_titles(restaurant_addresses, addresses)
+    distances = calc_distance_matrix(
+        [(addresses[title].lat, addresses[title].lon) for title in resolved_order_addresses],
+        [(addresses[title].lat, addresses[title].lon) for title in resolved_restaurant_addresses],
+        mode=settings.DISTANCE_MODE,
+    )
+    order_rows = {title: row for row, title in enumerate(resolved_order_addresses)}
+    restaurant_columns = {title: column for column, title in enumerate(resolved_restaurant_addresses)}
+
+    for candidate in candidates:
+        order_row = order_rows.get(candidate.order.address)
+        restaurant_column = restaurant_columns.get(candidate.restaurant.address)
+        candidate.distance = None
+        if order_row is not None and restaurant_column is not None:
+            candidate.distance = round(float(distances[order_row, restaurant_column]), 2)
+    OrderRestaurantCandidate.objects.bulk_update(candidates, ['distance'], batch_size=1000)
+
+    order_ids = sorted({candidate.order_id for candidate in candidates})
+    transaction.on_commit(lambda: orders_changed.send(sender=Order, order_ids=order_ids))
+    return len(order_ids)
@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import json
+import threading
+import uuid
+from collections import namedtuple
+
+import brotli
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .images import get_image_urls
+from .models import Banner, Product, ProductCategory
+
+CATALOG_VERSION_KEY = 'catalog:version'
+BANNERS_VERSION_KEY = 'banners:version'
+BROTLI_QUALITY = 9
+
+CompressedContent = namedtuple('CompressedContent', ['content', 'encoded'])
+
+
+class VersionedCache:
+    def __init__(self, build):
+        self.build = build
+        self.entry = (None, None)
+        self.lock = threading.Lock()
+
+    def get(self, version, *args):
+        cached_version, value = self.entry
+        if cached_version == version:
+            return value
+
+        with self.lock:
+            cached_version, value = self.entry
+            if cached_version != version:
+                value = self.build(*args)
+                self.entry = (version, value)
+            return value
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+def get_catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def get_banners_version():
+    return get_version(BANNERS_VERSION_KEY)
+
+
+def bump_banners_version():
+    bump_version(BANNERS_VERSION_KEY)
+
+
+PRODUCT_FIELDS = [
+    'id',
+    'name',
+    'price',
+    'special_status',
+    'description',
+    'category_id',
+    'category__name',
+    'image',
+    'image_derivatives',
+]
+
+STREAM_CHUNK_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def get_products_values(products):
+    return products.order_by('id').values(*PRODUCT_FIELDS)
+
+
+def serialize_product(product):
+    image_storage = Product._meta.get_field('image').storage
+    image_urls = get_image_urls(product['image'], product['image_derivatives'], image_storage)
+    return {
+        'id': product['id'],
+        'name': product['name'],
+        'price': product['price'],
+        'special_status': product['special_status'],
+        'description': product['description'],
+        'category': {
+            'id': product['category_id'],
+            'name': product['category__name'],
+        },
+        'image': image_storage.url(product['image']),
+        'image_thumb': image_urls['thumb'],
+        'image_srcset': image_urls['srcset'],
+        'image_webp_srcset': image_urls['webp_srcset'],
+        'restaurant': {
+            'id': product['id'],
+            'name': product['name'],
+        }
+    }
+
+
+def dump_json(data):
+    return json.dumps(
+        data,
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
+
+
+def compress_content(content):
+    return CompressedContent(content, {
+        'br': brotli.compress(content, quality=BROTLI_QUALITY),
+        'gzip': gzip.compress(content, mtime=0),
+    })
+
+
+def serialize_banners():
+    now = timezone.now()
+    banners = [
+        {
+            'title': banner.title,
+            'src': banner.image.url,
+            'text': banner.text,
+        }
+        for banner in Banner.objects.active(now)
+    ]
+    return banners, dump_json(banners), Banner.objects.get_next_change(now)
+
+
+def serialize_catalog():
+    products = get_products_values(Product.objects.available())
+    content = dump_json([serialize_product(product) for product in products])
+    etag = f'"{hashlib.sha1(content).hexdigest()}"'
+    return etag, compress_content(content)
+
+
+def serialize_bootstrap(banners):
+    products = get_products_values(Product.objects.available())
+    data = {
+        'products': [serialize_product(product) for product in products],
+        'categories': list(ProductCategory.objects.order_by('id').values('id', 'name')),
+        'banners': banners,
+    }
+    version = hashlib.sha1(dump_json(data)).hexdigest()[:16]
+    return version, compress_content(dump_json({'version': version, **data}))
+
+
+serialized_catalog = VersionedCache(serialize_catalog)
+serialized_bootstrap = VersionedCache(serialize_bootstrap)
+serialized_banners = VersionedCache(serialize_banners)
+
+
+def get_serialized_catalog():
+    return serialized_catalog.get(get_catalog_version())
+
+
+def get_serialized_banners():
+    banners, content, expires_at = serialized_banners.get(get_banners_version())
+    if expires_at and expires_at <= timezone.now():
+        bump_banners_version()
+        banners, content, expires_at = serialized_banners.get(get_banners_version())
+    return banners, content
+
+
+def get_serialized_bootstrap():
+    banners, _ = get_serialized_banners()
+    return serialized_bootstrap.get((get_catalog_version(), get_banners_version()), banners)
+
+
+def iter_serialized_products(products_values, ndjson=False):
+    products = products_values.iterator(chunk_size=STREAM_CHUNK_SIZE)
+    if not ndjson:
+        yield b'['
+
+    chunk = []
+    for number, product in enumerate(products):
+        content = dump_json(serialize_product(product))
+        if ndjson:
+            chunk.append(content + b'\n')
+        else:
+            chunk.append(content if not number else b',' + content)
+
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+
+    if chunk:
+        yield b''.join(chunk)
+    if not ndjson:
+        yield b']'
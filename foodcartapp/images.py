@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, features
+
+IMAGE_SIZES = {
+    'thumb': 100,
+    'medium': 400,
+}
+IMAGE_FORMATS = {
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+}
+DERIVATIVES_DIR = 'derivatives'
+
+
+def get_supported_formats():
+    return [
+        image_format for image_format in IMAGE_FORMATS
+        if image_format != 'webp' or features.check('webp')
+    ]
+
+
+def get_derivative_name(image_name, content_hash, size_name, image_format):
+    stem, _ = os.path.splitext(os.path.basename(image_name))
+    return f'{DERIVATIVES_DIR}/{stem}.{content_hash}.{size_name}.{image_format}'
+
+
+def render_derivative(image, width, image_format):
+    pillow_format, save_options = IMAGE_FORMATS[image_format]
+    derivative = image.copy()
+    derivative.thumbnail((width, width * 4), Image.LANCZOS)
+    if pillow_format == 'JPEG' and derivative.mode not in ('RGB', 'L'):
+        derivative = derivative.convert('RGB')
+
+    content = io.BytesIO()
+    derivative.save(content, pillow_format, **save_options)
+    return derivative.width, content.getvalue()
+
+
+def make_image_derivatives(image_name, storage=default_storage):
+    with storage.open(image_name, 'rb') as image_file:
+        original = image_file.read()
+    content_hash = hashlib.sha1(original).hexdigest()[:12]
+
+    image = Image.open(io.BytesIO(original))
+    image.load()
+
+    derivatives = {'source': image_name, 'width': image.width}
+    for image_format in get_supported_formats():
+        variants = {}
+        for size_name, width in IMAGE_SIZES.items():
+            derivative_name = get_derivative_name(image_name, content_hash, size_name, image_format)
+            if storage.exists(derivative_name):
+                with storage.open(derivative_name, 'rb') as derivative_file:
+                    derivative_width = Image.open(derivative_file).width
+            else:
+                derivative_width, content = render_derivative(image, width, image_format)
+                derivative_name = storage.save(derivative_name, ContentFile(content))
+            variants[size_name] = {'name': derivative_name, 'width': derivative_width}
+        derivatives[image_format] = variants
+    return derivatives
+
+
+def make_image_derivatives_safe(image_name):
+    try:
+        return image_name, make_image_derivatives(image_name), None
+    except (OSError, ValueError) as error:
+        return image_name, None, str(error)
+
+
+def get_image_urls(image_name, derivatives, storage=default_storage):
+    urls = {
+        'thumb': storage.url(image_name),
+        'srcset': '',
+        'webp_srcset': '',
+    }
+    if not derivatives or derivatives.get('source') != image_name or 'error' in derivatives:
+        return urls
+
+    for image_format, srcset_key in [('jpeg', 'srcset'), ('webp', 'webp_srcset')]:
+        variants = derivatives.get(image_format, {})
+        srcset = [f'{storage.url(variant["name"])} {variant["width"]}w' for variant in variants.values()]
+        if image_format == 'jpeg' and all(variant['width'] < derivatives['width'] for variant in variants.values()):
+            srcset.append(f'{storage.url(image_name)} {derivatives["width"]}w')
+        urls[srcset_key] = ', '.join(srcset)
+    if 'thumb' in derivatives.get('jpeg', {}):
+        urls['thumb'] = storage.url(derivatives['jpeg']['thumb']['name'])
+    return urls
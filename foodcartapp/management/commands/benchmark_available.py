@@ -0,0 +1,68 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from foodcartapp.models import Product, Restaurant, RestaurantMenuItem
+
+STRATEGIES = ['subquery', 'exists', 'flag']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает способы выборки товаров в продаже на синтетическом меню. Данные не сохраняются'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--restaurants', type=int, default=100)
+        parser.add_argument('--menu-share', type=float, default=0.5, help='доля ресторанов, где есть товар')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.fill_menu(options)
+                for strategy in STRATEGIES:
+                    with override_settings(PRODUCT_AVAILABILITY_STRATEGY=strategy):
+                        self.measure(strategy, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill_menu(self, options):
+        restaurants = Restaurant.objects.bulk_create(
+            Restaurant(name=f'Ресторан {number}') for number in range(options['restaurants'])
+        )
+        products = Product.objects.bulk_create(
+            (Product(name=f'Товар {number}', price=100, image='burger.jpg') for number in range(options['products'])),
+            batch_size=1000,
+        )
+        if not products[0].pk:
+            products = list(Product.objects.order_by('-pk')[:options['products']])
+            restaurants = list(Restaurant.objects.order_by('-pk')[:options['restaurants']])
+
+        menu_size = max(1, int(len(restaurants) * options['menu_share']))
+        menu_items = (
+            RestaurantMenuItem(restaurant=restaurant, product=product, availability=random.random() < 0.3)
+            for product in products
+            for restaurant in random.sample(restaurants, menu_size)
+        )
+        RestaurantMenuItem.objects.bulk_create(menu_items, batch_size=5000)
+        Product.objects.refresh_availability()
+
+    def measure(self, strategy, repeat):
+        products = Product.objects.available().values_list('id', flat=True)
+        self.stdout.write(f'\n--- {strategy} ---')
+        self.stdout.write(str(products.query))
+        self.stdout.write(products.explain())
+
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            found_count = len(list(products))
+        elapsed = (time.perf_counter() - started_at) / repeat
+        self.stdout.write(f'{found_count} товаров, {elapsed * 1000:.1f} мс на запрос')
@@ -0,0 +1,92 @@
+import gzip
+import os
+import time
+
+import brotli
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from foodcartapp.catalog import serialize_catalog
+from foodcartapp.models import Product, Restaurant, RestaurantMenuItem
+
+CODECS = [
+    ('gzip 6', lambda content: gzip.compress(content, compresslevel=6)),
+    ('gzip 9', lambda content: gzip.compress(content, compresslevel=9)),
+    ('brotli 5', lambda content: brotli.compress(content, quality=5)),
+    ('brotli 9', lambda content: brotli.compress(content, quality=9)),
+    ('brotli 11', lambda content: brotli.compress(content, quality=11)),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает размер каталога и собранной статики без сжатия и со сжатием. Данные не сохраняются'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help='сколько товаров добавить в каталог')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.fill_catalog(options['products'])
+                _, compressed_content = serialize_catalog()
+                raise Rollback
+        except Rollback:
+            pass
+
+        content = compressed_content.content
+        self.stdout.write(f'Каталог: {len(content)} байт')
+        for codec_name, compress in CODECS:
+            started_at = time.perf_counter()
+            compressed = compress(content)
+            elapsed = time.perf_counter() - started_at
+            self.stdout.write(
+                f'{codec_name}: {len(compressed)} байт, {len(compressed) / len(content):.1%} '
+                f'от исходного, {elapsed * 1000:.1f} мс'
+            )
+        self.report_static()
+
+    def fill_catalog(self, products_count):
+        restaurant = Restaurant.objects.create(name='Ресторан для замера')
+        products = Product.objects.bulk_create(
+            (
+                Product(
+                    name=f'Товар {number}',
+                    price=100 + number % 500,
+                    image='burger.jpg',
+                    description='Сочная котлета из говядины, свежие овощи и фирменный соус на мягкой булочке',
+                )
+                for number in range(products_count)
+            ),
+            batch_size=1000,
+        )
+        if not products[0].pk:
+            products = list(Product.objects.order_by('-pk')[:products_count])
+        RestaurantMenuItem.objects.bulk_create(
+            (RestaurantMenuItem(restaurant=restaurant, product=product) for product in products),
+            batch_size=1000,
+        )
+        Product.objects.refresh_availability()
+
+    def report_static(self):
+        sizes = {'': 0, '.gz': 0, '.br': 0}
+        for directory, _, filenames in os.walk(settings.STATIC_ROOT):
+            for filename in filenames:
+                if not os.path.exists(os.path.join(directory, filename + '.gz')):
+                    continue
+                for suffix in sizes:
+                    path = os.path.join(directory, filename + suffix)
+                    if os.path.exists(path):
+                        sizes[suffix] += os.path.getsize(path)
+
+        if not sizes['']:
+            self.stdout.write('\nСжатой статики нет, сначала выполните collectstatic')
+            return
+        self.stdout.write(
+            f'\nСтатика со сжатыми копиями: {sizes[""]} байт, '
+            f'gzip {sizes[".gz"]} байт, brotli {sizes[".br"]} байт'
+        )
@@ -0,0 +1,104 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from foodcartapp.models import Order, OrderItem, Product
+
+
+class Rollback(Exception):
+    pass
+
+
+def fetch_aggregated_prices(orders):
+    return {order.id: order.price for order in orders.annotate_with_order_price()}
+
+
+def fetch_prefetched_prices(orders):
+    return {
+        order.id: sum(item.quantity * item.price for item in order.items.all())
+        for order in orders.prefetch_related('items')
+    }
+
+
+def fetch_stored_prices(orders):
+    return {order.id: order.total_price for order in orders}
+
+
+STRATEGIES = {
+    'aggregate': fetch_aggregated_prices,
+    'prefetch': fetch_prefetched_prices,
+    'stored': fetch_stored_prices,
+}
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает способы посчитать сумму заказов на синтетических данных. Данные не сохраняются'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=50000)
+        parser.add_argument('--items', type=int, default=3, help='позиций в заказе')
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                orders = self.fill_orders(options).order_by('-created_at', '-id')
+                page_ids = list(orders.values_list('id', flat=True)[:options['page_size']])
+                self.measure('все заказы', orders, options['repeat'])
+                self.measure(f'страница из {len(page_ids)}', orders.filter(id__in=page_ids), options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill_orders(self, options):
+        products = list(Product.objects.bulk_create(
+            Product(name=f'Товар {number}', price=random.randint(100, 900), image='burger.jpg')
+            for number in range(100)
+        ))
+        if not products[0].pk:
+            products = list(Product.objects.order_by('-pk')[:100])
+
+        last_order_id = Order.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        Order.objects.bulk_create(
+            (
+                Order(firstname='Иван', lastname='Иванов', phonenumber='+79291000000', address='Москва')
+                for _ in range(options['orders'])
+            ),
+            batch_size=1000,
+        )
+        orders = Order.objects.filter(id__gt=last_order_id)
+        order_ids = list(orders.values_list('id', flat=True))
+
+        order_items = (
+            OrderItem(order_id=order_id, product=product, quantity=random.randint(1, 5), price=product.price)
+            for order_id in order_ids
+            for product in random.sample(products, options['items'])
+        )
+        OrderItem.objects.bulk_create(order_items, batch_size=5000)
+
+        started_at = time.perf_counter()
+        orders.refresh_total_price()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(f'{len(order_ids)} заказов, пересчёт total_price: {elapsed * 1000:.0f} мс')
+        return orders
+
+    def measure(self, title, orders, repeat):
+        self.stdout.write(f'\n--- {title} ---')
+        expected_prices = None
+        for strategy, fetch_prices in STRATEGIES.items():
+            started_at = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(repeat):
+                    prices = fetch_prices(orders.all())
+            elapsed = (time.perf_counter() - started_at) / repeat
+
+            if expected_prices is None:
+                expected_prices = prices
+            assert prices == expected_prices, f'{strategy} считает суммы иначе'
+            self.stdout.write(
+                f'{strategy}: {elapsed * 1000:.1f} мс, {len(queries) // repeat} SQL-запросов'
+            )
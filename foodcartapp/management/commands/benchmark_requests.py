@@ -0,0 +1,37 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время ответа на запрос через весь стек middleware текущего профиля настроек'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/products/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--host', default='localhost', help='должен быть в ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'], HTTP_ACCEPT_ENCODING='gzip', REMOTE_ADDR='127.0.0.1')
+        for _ in range(options['warmup']):
+            response = client.get(options['url'])
+            if response.status_code != 200:
+                raise CommandError(f'{options["url"]} ответил {response.status_code}')
+
+        timings = []
+        for _ in range(options['requests']):
+            started_at = time.perf_counter()
+            client.get(options['url'])
+            timings.append((time.perf_counter() - started_at) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f'Профиль {settings.SETTINGS_PROFILE}, DEBUG={settings.DEBUG}, middleware: {len(settings.MIDDLEWARE)}\n'
+            f'{options["url"]}: медиана {statistics.median(timings):.2f} мс, '
+            f'95-й перцентиль {timings[int(len(timings) * 0.95)]:.2f} мс, '
+            f'среднее {statistics.mean(timings):.2f} мс за {options["requests"]} запросов'
+        )
@@ -0,0 +1,31 @@
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время запуска `manage.py check` в отдельном процессе'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10)
+
+    def handle(self, *args, **options):
+        timings = []
+        for _ in range(options['runs']):
+            started_at = time.perf_counter()
+            subprocess.run(
+                [sys.executable, 'manage.py', 'check'],
+                cwd=settings.BASE_DIR,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            timings.append(time.perf_counter() - started_at)
+
+        self.stdout.write(
+            f'manage.py check: медиана {statistics.median(timings) * 1000:.0f} мс, '
+            f'минимум {min(timings) * 1000:.0f} мс за {options["runs"]} запусков'
+        )
@@ -0,0 +1,148 @@
+import json
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import connection, transaction
+
+from foodcartapp.candidates import refresh_order_candidates
+from foodcartapp.catalog import bump_catalog_version
+from foodcartapp.models import Product, Order, Restaurant, RestaurantMenuItem
+from geo_places.models import Address
+
+READ_SIZE = 64 * 1024
+
+
+def iter_json_array(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив объектов')
+    buffer = buffer[1:]
+
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise CommandError('Файл с данными оборван')
+            buffer += chunk
+            continue
+        yield record
+        buffer = buffer[end:]
+
+
+def iter_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(file, data_format):
+    if data_format == 'ndjson':
+        return iter_ndjson(file)
+    return iter_json_array(file)
+
+
+def prepare_instance(instance):
+    if isinstance(instance, Address):
+        instance.key = Address.normalize_title(instance.title)
+    return instance
+
+
+class Command(BaseCommand):
+    help = 'Загружает рестораны, меню, заказы и адреса из JSON или NDJSON в формате фикстур Django пачками через bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='путь к файлу или - для stdin')
+        parser.add_argument('--format', choices=['json', 'ndjson'], help='по умолчанию определяется по расширению')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--ignore-conflicts', action='store_true', help='пропускать уже существующие строки')
+
+    def handle(self, *args, **options):
+        data_format = options['format']
+        if not data_format:
+            data_format = 'ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'json'
+
+        started_at = time.perf_counter()
+        if options['path'] == '-':
+            loaded_counts = self.load(sys.stdin, data_format, options)
+        else:
+            with open(options['path'], encoding='utf-8') as file:
+                loaded_counts = self.load(file, data_format, options)
+
+        elapsed = time.perf_counter() - started_at
+        for model, (read_count, inserted_count) in loaded_counts.items():
+            skipped = f', пропущено существующих: {read_count - inserted_count}' if read_count != inserted_count else ''
+            self.stdout.write(f'{model._meta.label}: добавлено {inserted_count}{skipped}')
+        self.stdout.write(f'Загружено за {elapsed:.1f} с')
+
+    def load(self, file, data_format, options):
+        chunk_size = options['chunk_size']
+        pending_instances = defaultdict(list)
+        read_counts = defaultdict(int)
+        initial_counts = {}
+        loaded_order_ids = []
+
+        def flush(model):
+            instances = pending_instances.pop(model, [])
+            if options['ignore_conflicts'] and model not in initial_counts:
+                initial_counts[model] = model.objects.count()
+            model.objects.bulk_create(instances, ignore_conflicts=options['ignore_conflicts'])
+            read_counts[model] += len(instances)
+            if model is Order:
+                loaded_order_ids.extend(instance.pk for instance in instances)
+
+        with transaction.atomic(), connection.constraint_checks_disabled():
+            try:
+                for deserialized in Deserializer(iter_records(file, data_format), ignorenonexistent=True):
+                    instance = prepare_instance(deserialized.object)
+                    model = type(instance)
+                    pending_instances[model].append(instance)
+                    if len(pending_instances[model]) >= chunk_size:
+                        flush(model)
+            except (DeserializationError, json.JSONDecodeError) as error:
+                raise CommandError(f'Не удалось разобрать данные: {error}')
+
+            for model in list(pending_instances):
+                flush(model)
+
+            table_names = [model._meta.db_table for model in read_counts]
+            connection.check_constraints(table_names=table_names)
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(read_counts))
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+            Product.objects.refresh_availability()
+            for first_index in range(0, len(loaded_order_ids), chunk_size):
+                Order.objects.filter(
+                    pk__in=loaded_order_ids[first_index:first_index + chunk_size],
+                ).refresh_total_price()
+
+            if read_counts.keys() & {Restaurant, RestaurantMenuItem, Address}:
+                refresh_order_candidates(Order.objects.filter(status='waiting'))
+            else:
+                for first_index in range(0, len(loaded_order_ids), chunk_size):
+                    refresh_order_candidates(
+                        Order.objects.filter(pk__in=loaded_order_ids[first_index:first_index + chunk_size]),
+                    )
+            transaction.on_commit(bump_catalog_version)
+
+            inserted_counts = {
+                model: model.objects.count() - initial_count
+                for model, initial_count in initial_counts.items()
+            }
+
+        return {
+            model: (read_count, inserted_counts.get(model, read_count))
+            for model, read_count in read_counts.items()
+        }
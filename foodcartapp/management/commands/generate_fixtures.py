@@ -0,0 +1,148 @@
+import json
+import random
+import sys
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.utils import timezone
+
+from foodcartapp.models import Restaurant, ProductCategory, Product, RestaurantMenuItem, Order, OrderItem
+from geo_places.models import Address
+
+MOSCOW_LAT = (55.57, 55.91)
+MOSCOW_LON = (37.37, 37.85)
+
+STREETS = [
+    'ул. Тверская', 'ул. Новый Арбат', 'ул. Арбат', 'Ленинский пр-т', 'пр-т Мира',
+    'ул. Профсоюзная', 'Кутузовский пр-т', 'ул. Большая Ордынка', 'ул. Покровка', 'ул. Маросейка',
+    'Цветной бульвар', 'ул. Садовая-Кудринская', 'Варшавское ш.', 'Дмитровское ш.', 'ул. Бауманская',
+    'ул. Лесная', 'ул. Пятницкая', 'Шаболовка', 'ул. Вавилова', 'Измайловский б-р',
+]
+CATEGORIES = ['Бургер', 'Напиток', 'Закуска', 'Десерт', 'Салат']
+IMAGES = ['burger.jpg', 'food.jpg', 'tasty.jpg']
+FIRSTNAMES = ['Иван', 'Анна', 'Пётр', 'Мария', 'Алексей', 'Ольга', 'Сергей', 'Елена']
+LASTNAMES = ['Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов', 'Лебедева', 'Козлов', 'Новикова']
+MAX_HOUSE_NUMBER = 300
+MAX_BUILDING_NUMBER = 9
+MAX_ADDRESSES = len(STREETS) * MAX_HOUSE_NUMBER * MAX_BUILDING_NUMBER // 2
+
+
+def get_next_ids(models):
+    return {
+        model: (model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0) + 1
+        for model in models
+    }
+
+
+class Command(BaseCommand):
+    help = 'Генерирует NDJSON с ресторанами, меню, заказами и геокодированными адресами в Москве для bulk_loaddata'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=50)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--menu-share', type=float, default=0.7, help='доля товаров в меню ресторана')
+        parser.add_argument('--availability', type=float, default=0.9, help='доля пунктов меню в продаже')
+        parser.add_argument('--addresses', type=int, default=5000, help='сколько разных адресов у заказов')
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', help='путь к файлу, по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        if options['addresses'] + options['restaurants'] > MAX_ADDRESSES:
+            raise CommandError(f'Можно сгенерировать не больше {MAX_ADDRESSES} адресов')
+
+        random.seed(options['seed'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                self.generate(output, options)
+        else:
+            self.generate(sys.stdout, options)
+
+    def generate(self, output, options):
+        next_ids = get_next_ids([Restaurant, ProductCategory, Product, RestaurantMenuItem, Order, OrderItem, Address])
+        existing_keys = set(Address.objects.values_list('key', flat=True))
+        now = timezone.now()
+
+        def write(model, fields):
+            pk = next_ids[model]
+            next_ids[model] += 1
+            record = {'model': model._meta.label_lower, 'pk': pk, 'fields': fields}
+            output.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+            return pk
+
+        address_titles = set()
+
+        def write_address():
+            while True:
+                house_number = random.randint(1, MAX_HOUSE_NUMBER)
+                building_number = random.randint(1, MAX_BUILDING_NUMBER)
+                title = f'Москва, {random.choice(STREETS)}, {house_number}к{building_number}'
+                if title not in address_titles and Address.normalize_title(title) not in existing_keys:
+                    break
+            address_titles.add(title)
+            write(Address, {
+                'title': title,
+                'lat': f'{random.uniform(*MOSCOW_LAT):.6f}',
+                'lon': f'{random.uniform(*MOSCOW_LON):.6f}',
+                'requested_at': now,
+            })
+            return title
+
+        restaurant_ids = [
+            write(Restaurant, {
+                'name': f'Star Burger {number}',
+                'address': write_address(),
+                'contact_phone': f'+7 (900) {number:03d}-00-00',
+            })
+            for number in range(1, options['restaurants'] + 1)
+        ]
+        category_ids = [write(ProductCategory, {'name': name}) for name in CATEGORIES]
+
+        products = {}
+        for number in range(1, options['products'] + 1):
+            price = random.randint(50, 900)
+            product_id = write(Product, {
+                'name': f'Товар {number}',
+                'category': random.choice(category_ids),
+                'price': f'{price}.00',
+                'image': random.choice(IMAGES),
+                'special_status': random.random() < 0.05,
+                'description': '',
+            })
+            products[product_id] = price
+        product_ids = list(products)
+
+        menu_size = max(1, int(len(product_ids) * options['menu_share']))
+        for restaurant_id in restaurant_ids:
+            for product_id in random.sample(product_ids, menu_size):
+                write(RestaurantMenuItem, {
+                    'restaurant': restaurant_id,
+                    'product': product_id,
+                    'availability': random.random() < options['availability'],
+                })
+
+        order_addresses = [write_address() for _ in range(options['addresses'])]
+        for _ in range(options['orders']):
+            order_items = [
+                (product_id, random.randint(1, 3))
+                for product_id in random.sample(product_ids, random.randint(1, 4))
+            ]
+            order_id = write(Order, {
+                'firstname': random.choice(FIRSTNAMES),
+                'lastname': random.choice(LASTNAMES),
+                'phonenumber': f'+7929{random.randint(0, 9999999):07d}',
+                'address': random.choice(order_addresses),
+                'payment_method': random.choice(Order.PAYMENT_METHODS)[0],
+                'status': random.choices(Order.ORDER_STATUSES, weights=[1, 1, 6, 1])[0][0],
+                'created_at': now - timedelta(minutes=random.randint(0, 60 * 24 * 90)),
+                'total_price': sum(products[product_id] * quantity for product_id, quantity in order_items),
+            })
+            for product_id, quantity in order_items:
+                write(OrderItem, {
+                    'order': order_id,
+                    'product': product_id,
+                    'quantity': quantity,
+                    'price': f'{products[product_id]}.00',
+                })
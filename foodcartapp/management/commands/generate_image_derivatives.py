@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from foodcartapp.catalog import bump_catalog_version
+from foodcartapp.images import make_image_derivatives_safe
+from foodcartapp.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии картинок товаров в нескольких процессах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='по умолчанию по числу ядер')
+        parser.add_argument('--force', action='store_true', help='пересоздать уже готовые копии')
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').only('image', 'image_derivatives')
+        products_by_image = {}
+        for product in products:
+            derivatives = product.image_derivatives
+            if options['force'] or 'error' in derivatives or derivatives.get('source') != product.image.name:
+                products_by_image.setdefault(product.image.name, []).append(product)
+
+        if not products_by_image:
+            self.stdout.write('Все картинки уже обработаны')
+            return
+
+        connection.close()
+        processed_count = 0
+        updated_products = []
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for image_name, derivatives, error in executor.map(make_image_derivatives_safe, products_by_image):
+                if error:
+                    self.stderr.write(f'{image_name}: {error}')
+                    continue
+                processed_count += 1
+                for product in products_by_image[image_name]:
+                    product.image_derivatives = derivatives
+                    updated_products.append(product)
+
+        Product.objects.bulk_update(updated_products, ['image_derivatives'], batch_size=500)
+        bump_catalog_version()
+        self.stdout.write(f'Обработано картинок: {processed_count}, товаров: {len(updated_products)}')
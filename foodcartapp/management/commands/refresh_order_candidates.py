@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.candidates import refresh_order_candidates
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рестораны, которые могут приготовить необработанные заказы'
+
+    def handle(self, *args, **options):
+        refreshed_count = refresh_order_candidates(Order.objects.filter(status='waiting'))
+        self.stdout.write(f'Пересчитаны рестораны для {refreshed_count} заказов')
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 03:03
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def fill_product_availability(apps, schema_editor):
+    Product = apps.get_model('foodcartapp', 'Product')
+    RestaurantMenuItem = apps.get_model('foodcartapp', 'RestaurantMenuItem')
+    available_menu_items = RestaurantMenuItem.objects.filter(
+        product=OuterRef('pk'),
+        availability=True,
+    )
+    Product.objects.update(is_available=Exists(available_menu_items))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0061_alter_order_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_available',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='есть в продаже'),
+        ),
+        migrations.RunPython(fill_product_availability, migrations.RunPython.noop),
+    ]
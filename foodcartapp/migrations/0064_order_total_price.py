@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 12:40
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_order_total_price(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    OrderItem = apps.get_model('foodcartapp', 'OrderItem')
+    order_total_prices = OrderItem.objects.filter(order=OuterRef('pk'))\
+        .values('order')\
+        .annotate(total_price=Sum(F('quantity') * F('price')))\
+        .values('total_price')
+    Order.objects.update(total_price=Coalesce(
+        Subquery(order_total_prices, output_field=models.DecimalField()),
+        Value(0),
+        output_field=models.DecimalField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0063_orderrestaurantcandidate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='сумма заказа'),
+        ),
+        migrations.RunPython(fill_order_total_price, migrations.RunPython.noop),
+    ]
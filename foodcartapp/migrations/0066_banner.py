@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-18 03:52
+
+from django.contrib.staticfiles import finders
+from django.core.files import File
+from django.db import migrations, models
+
+DEFAULT_BANNERS = [
+    ('Burger', 'burger.jpg', 'Tasty Burger at your door step'),
+    ('Spices', 'food.jpg', 'All Cuisines'),
+    ('New York', 'tasty.jpg', 'Food is incomplete without a tasty dessert'),
+]
+
+
+def create_default_banners(apps, schema_editor):
+    Banner = apps.get_model('foodcartapp', 'Banner')
+    for order, (title, image_name, text) in enumerate(DEFAULT_BANNERS):
+        banner = Banner(title=title, text=text, order=order, image=f'banners/{image_name}')
+        storage = banner.image.storage
+        if not storage.exists(banner.image.name):
+            image_path = finders.find(image_name)
+            if not image_path:
+                continue
+            with open(image_path, 'rb') as image_file:
+                banner.image.name = storage.save(banner.image.name, File(image_file))
+        banner.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0065_product_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Banner',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, verbose_name='заголовок')),
+                ('text', models.CharField(blank=True, max_length=200, verbose_name='текст')),
+                ('image', models.ImageField(upload_to='banners', verbose_name='картинка')),
+                ('order', models.PositiveIntegerField(db_index=True, default=0, verbose_name='порядок')),
+                ('is_active', models.BooleanField(db_index=True, default=True, verbose_name='показывать')),
+                ('active_from', models.DateTimeField(blank=True, null=True, verbose_name='показывать с')),
+                ('active_until', models.DateTimeField(blank=True, null=True, verbose_name='показывать до')),
+            ],
+            options={
+                'verbose_name': 'баннер',
+                'verbose_name_plural': 'баннеры',
+                'ordering': ('order', 'id'),
+            },
+        ),
+        migrations.RunPython(create_default_banners, migrations.RunPython.noop),
+    ]
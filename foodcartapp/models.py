@@ -1,9 +1,15 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator
-from django.db.models import F, Sum, Prefetch
+from django.db.models import F, Q, Min, Sum, Prefetch, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from .signals import menu_availability_changed
+
 
 class Restaurant(models.Model):
     name = models.CharField(
@@ -29,8 +35,21 @@ class Restaurant(models.Model):
         return self.name
 
 
+def get_available_menu_items():
+    return RestaurantMenuItem.objects.filter(
+        product=OuterRef('pk'),
+        availability=True,
+    )
+
+
 class ProductQuerySet(models.QuerySet):
     def available(self):
+        strategy = settings.PRODUCT_AVAILABILITY_STRATEGY
+        if strategy == 'flag':
+            return self.filter(is_available=True)
+        if strategy == 'exists':
+            return self.filter(Exists(get_available_menu_items()))
+
         products = (
             RestaurantMenuItem.objects
             .filter(availability=True)
@@ -38,6 +57,46 @@ class ProductQuerySet(models.QuerySet):
         )
         return self.filter(pk__in=products)
 
+    def refresh_availability(self):
+        return self.update(is_available=Exists(get_available_menu_items()))
+
+
+class ProductAvailabilityIndex:
+    def __init__(self, restaurants_by_product):
+        self.restaurants_by_product = restaurants_by_product
+
+    @classmethod
+    def build(cls, product_ids=None):
+        restaurants_by_product = defaultdict(set)
+        menu_items = (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('product_id', 'restaurant_id')
+        )
+        if product_ids is not None:
+            menu_items = menu_items.filter(product_id__in=product_ids)
+        for product_id, restaurant_id in menu_items.iterator():
+            restaurants_by_product[product_id].add(restaurant_id)
+
+        return cls({
+            product_id: frozenset(restaurant_ids)
+            for product_id, restaurant_ids in restaurants_by_product.items()
+        })
+
+    def is_available(self, product_id):
+        return bool(self.restaurants_by_product.get(product_id))
+
+    def get_restaurants(self, product_ids):
+        product_ids = set(product_ids)
+        if not product_ids:
+            return frozenset()
+
+        restaurants_per_product = sorted(
+            (self.restaurants_by_product.get(product_id, frozenset()) for product_id in product_ids),
+            key=len,
+        )
+        return frozenset.intersection(*restaurants_per_product)
+
 
 class ProductCategory(models.Model):
     name = models.CharField(
@@ -85,6 +144,18 @@ class Product(models.Model):
         max_length=200,
         blank=True,
     )
+    is_available = models.BooleanField(
+        'есть в продаже',
+        default=False,
+        editable=False,
+        db_index=True,
+    )
+    image_derivatives = models.JSONField(
+        'уменьшенные копии картинки',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
 
     objects = ProductQuerySet.as_manager()
 
@@ -96,6 +167,41 @@ class Product(models.Model):
         return self.name
 
 
+class RestaurantMenuItemQuerySet(models.QuerySet):
+    def set_availability(self, availability):
+        menu_items = self.exclude(availability=availability)
+        product_ids = set(menu_items.values_list('product_id', flat=True))
+        updated_count = menu_items.update(availability=availability)
+        if updated_count:
+            menu_availability_changed.send(sender=RestaurantMenuItem, product_ids=product_ids)
+        return updated_count
+
+    def bulk_set_availability(self, availability_by_pair):
+        restaurant_ids = {restaurant_id for restaurant_id, _ in availability_by_pair}
+        product_ids = {product_id for _, product_id in availability_by_pair}
+        menu_items = self.filter(restaurant_id__in=restaurant_ids, product_id__in=product_ids)\
+            .only('restaurant_id', 'product_id', 'availability')
+
+        found_pairs = set()
+        changed_menu_items = []
+        for menu_item in menu_items:
+            pair = (menu_item.restaurant_id, menu_item.product_id)
+            if pair not in availability_by_pair:
+                continue
+            found_pairs.add(pair)
+            if menu_item.availability != availability_by_pair[pair]:
+                menu_item.availability = availability_by_pair[pair]
+                changed_menu_items.append(menu_item)
+
+        self.bulk_update(changed_menu_items, ['availability'], batch_size=500)
+        if changed_menu_items:
+            menu_availability_changed.send(
+                sender=RestaurantMenuItem,
+                product_ids={menu_item.product_id for menu_item in changed_menu_items},
+            )
+        return len(changed_menu_items), availability_by_pair.keys() - found_pairs
+
+
 class RestaurantMenuItem(models.Model):
     restaurant = models.ForeignKey(
         Restaurant,
@@ -115,6 +221,8 @@ class RestaurantMenuItem(models.Model):
         db_index=True
     )
 
+    objects = RestaurantMenuItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'пункт меню ресторана'
         verbose_name_plural = 'пункты меню ресторана'
@@ -126,7 +234,21 @@ class RestaurantMenuItem(models.Model):
         return f"{self.restaurant.name} - {self.product.name}"
 
 
+def get_order_total_prices():
+    return OrderItem.objects.filter(order=OuterRef('pk'))\
+        .values('order')\
+        .annotate(total_price=Sum(F('quantity') * F('price')))\
+        .values('total_price')
+
+
 class OrderQuerySet(models.QuerySet):
+    def refresh_total_price(self):
+        return self.update(total_price=Coalesce(
+            Subquery(get_order_total_prices(), output_field=models.DecimalField()),
+            Value(0),
+            output_field=models.DecimalField(),
+        ))
+
     def annotate_with_order_price(self):
         order_price = Sum(F('items__quantity') * F('items__price'))
         order_items = OrderItem.objects.select_related('product')
@@ -182,6 +304,13 @@ class Order(models.Model):
     created_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Создан в')
     called_at = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name='Позвонили в')
     delivered_at = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name='Доставлен в')
+    total_price = models.DecimalField(
+        default=0,
+        decimal_places=2,
+        max_digits=10,
+        editable=False,
+        verbose_name='сумма заказа'
+    )
 
     objects = OrderQuerySet.as_manager()
 
@@ -225,3 +354,73 @@ class OrderItem(models.Model):
         verbose_name = 'элемент заказа'
         verbose_name_plural = 'элементы заказа'
 
+
+class OrderRestaurantCandidate(models.Model):
+    order = models.ForeignKey(
+        Order,
+        related_name='restaurant_candidates',
+        on_delete=models.CASCADE,
+        verbose_name='заказ'
+    )
+    restaurant = models.ForeignKey(
+        Restaurant,
+        related_name='order_candidates',
+        on_delete=models.CASCADE,
+        verbose_name='ресторан'
+    )
+    distance = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        verbose_name='расстояние, км'
+    )
+
+    def __str__(self):
+        return f'{self.order_id} - {self.restaurant_id} ({self.distance} км)'
+
+    class Meta:
+        verbose_name = 'ресторан для заказа'
+        verbose_name_plural = 'рестораны для заказов'
+        unique_together = [
+            ['order', 'restaurant']
+        ]
+        indexes = [
+            models.Index(fields=['order', 'distance']),
+        ]
+
+
+class BannerQuerySet(models.QuerySet):
+    def active(self, now):
+        return self.filter(
+            Q(active_from__isnull=True) | Q(active_from__lte=now),
+            Q(active_until__isnull=True) | Q(active_until__gt=now),
+            is_active=True,
+        )
+
+    def get_next_change(self, now):
+        changes = self.filter(is_active=True).aggregate(
+            next_start=Min('active_from', filter=Q(active_from__gt=now)),
+            next_end=Min('active_until', filter=Q(active_until__gt=now)),
+        )
+        return min(filter(None, changes.values()), default=None)
+
+
+class Banner(models.Model):
+    title = models.CharField('заголовок', max_length=100)
+    text = models.CharField('текст', max_length=200, blank=True)
+    image = models.ImageField('картинка', upload_to='banners')
+    order = models.PositiveIntegerField('порядок', default=0, db_index=True)
+    is_active = models.BooleanField('показывать', default=True, db_index=True)
+    active_from = models.DateTimeField('показывать с', blank=True, null=True)
+    active_until = models.DateTimeField('показывать до', blank=True, null=True)
+
+    objects = BannerQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'баннер'
+        verbose_name_plural = 'баннеры'
+        ordering = ('order', 'id')
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from geo_places.models import Address
+from geo_places.signals import addresses_geocoded
+from star_burger.error_reporting import error_reporter
+
+from .candidates import refresh_order_candidates, refresh_orders_with_addresses, refresh_restaurant_candidates
+from .catalog import bump_catalog_version, bump_banners_version
+from .images import make_image_derivatives_safe
+from .models import Banner, Product, ProductCategory, Restaurant, RestaurantMenuItem, Order, OrderItem
+from .signals import menu_availability_changed
+
+
+@receiver(post_save, sender=Restaurant)
+def enqueue_restaurant_address(sender, instance, **kwargs):
+    Address.objects.enqueue([instance.address])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def invalidate_catalog(sender, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def invalidate_banners(sender, **kwargs):
+    transaction.on_commit(bump_banners_version)
+
+
+def update_image_derivatives(product_id, image_name):
+    image_name, image_derivatives, error = make_image_derivatives_safe(image_name)
+    if error:
+        error_reporter.report_message('Can\'t make image derivatives', 'warning', extra_data={
+            'image': image_name,
+            'error': error,
+        })
+        image_derivatives = {'source': image_name, 'error': error}
+
+    Product.objects.filter(pk=product_id, image=image_name).update(image_derivatives=image_derivatives)
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Product)
+def refresh_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image or instance.image_derivatives.get('source') == instance.image.name:
+        return
+    product_id, image_name = instance.pk, instance.image.name
+    transaction.on_commit(lambda: update_image_derivatives(product_id, image_name))
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def refresh_product_availability(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id).refresh_availability()
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_total_price(sender, instance, **kwargs):
+    Order.objects.filter(pk=instance.order_id).refresh_total_price()
+
+
+def schedule_candidates_refresh(orders):
+    transaction.on_commit(lambda: refresh_order_candidates(orders))
+
+
+@receiver(post_save, sender=Order)
+def refresh_candidates_on_order_change(sender, instance, **kwargs):
+    schedule_candidates_refresh(Order.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_candidates_on_order_items_change(sender, instance, **kwargs):
+    schedule_candidates_refresh(Order.objects.filter(pk=instance.order_id))
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def refresh_candidates_on_menu_change(sender, instance, **kwargs):
+    schedule_candidates_refresh(Order.objects.filter(items__product_id=instance.product_id).distinct())
+
+
+@receiver(menu_availability_changed)
+def refresh_menu_availability(sender, product_ids, **kwargs):
+    Product.objects.filter(pk__in=product_ids).refresh_availability()
+    transaction.on_commit(bump_catalog_version)
+    schedule_candidates_refresh(Order.objects.filter(items__product_id__in=product_ids).distinct())
+
+
+@receiver(pre_save, sender=Restaurant)
+def remember_restaurant_address(sender, instance, update_fields=None, **kwargs):
+    instance.saved_address = None
+    if instance.pk and (update_fields is None or 'address' in update_fields):
+        instance.saved_address = Restaurant.objects.filter(pk=instance.pk)\
+            .values_list('address', flat=True).first()
+
+
+@receiver(post_save, sender=Restaurant)
+def refresh_candidates_on_restaurant_change(sender, instance, created, **kwargs):
+    if created or instance.saved_address is None or instance.saved_address == instance.address:
+        return
+    restaurant_id = instance.id
+    transaction.on_commit(lambda: refresh_restaurant_candidates([restaurant_id]))
+
+
+@receiver(addresses_geocoded)
+def refresh_candidates_on_geocoding(sender, keys, **kwargs):
+    restaurant_ids = [
+        restaurant_id
+        for restaurant_id, address in Restaurant.objects.exclude(address='').values_list('id', 'address')
+        if Address.normalize_title(address) in keys
+    ]
+    if restaurant_ids:
+        refresh_restaurant_candidates(restaurant_ids)
+    refresh_orders_with_addresses(keys)
@@ -1,13 +1,56 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import ModelSerializer, Serializer, ListSerializer, IntegerField, BooleanField
 from phonenumber_field.serializerfields import PhoneNumberField
 
-from foodcartapp.models import Order, OrderItem
+from foodcartapp.models import Order, Product
 
 
-class OrderItemSerializer(ModelSerializer):
+def collect_product_ids(orders_data):
+    product_ids = set()
+    for order_data in orders_data:
+        items = order_data.get('products') if isinstance(order_data, dict) else None
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            try:
+                product_ids.add(int(item['product']))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return product_ids
+
+
+class OrderItemListSerializer(ListSerializer):
+    def get_products(self, product_ids):
+        products = self.context.get('products')
+        if products is None:
+            products = Product.objects.only('price').in_bulk(product_ids)
+        return products
+
+    def to_internal_value(self, data):
+        items = super().to_internal_value(data)
+
+        product_ids = {item['product'] for item in items}
+        products = self.get_products(product_ids)
+
+        unknown_product_ids = sorted(product_ids - products.keys())
+        if unknown_product_ids:
+            does_not_exist = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+            raise ValidationError([
+                does_not_exist.format(pk_value=product_id) for product_id in unknown_product_ids
+            ])
+
+        for item in items:
+            item['product'] = products[item['product']]
+        return items
+
+
+class OrderItemSerializer(Serializer):
+    product = IntegerField(min_value=1)
+    quantity = IntegerField(min_value=1)
+
     class Meta:
-        model = OrderItem
-        fields = ['quantity', 'product']
+        list_serializer_class = OrderItemListSerializer
 
 
 class OrderSerializer(ModelSerializer):
@@ -19,4 +62,7 @@ class OrderSerializer(ModelSerializer):
         fields = ['id', 'firstname', 'lastname', 'phonenumber', 'address', 'products']
 
 
-
+class MenuAvailabilitySerializer(Serializer):
+    restaurant = IntegerField(min_value=1)
+    product = IntegerField(min_value=1)
+    availability = BooleanField()
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+orders_changed = Signal()
+menu_availability_changed = Signal()
@@ -0,0 +1,94 @@
+import io
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from .candidates import refresh_order_candidates
+from .images import get_image_urls, make_image_derivatives_safe
+from .models import Order, OrderRestaurantCandidate, Product, Restaurant, RestaurantMenuItem
+
+
+class BulkOrdersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+        cls.restaurant = Restaurant.objects.create(name='Star Burger Арбат', address='Москва, Арбат 15')
+        RestaurantMenuItem.objects.create(restaurant=cls.restaurant, product=cls.product)
+
+    def make_order(self, firstname, quantity=1):
+        return {
+            'firstname': firstname,
+            'lastname': 'Иванов',
+            'phonenumber': '+79291000000',
+            'address': 'Москва, Арбат 15',
+            'products': [{'product': self.product.id, 'quantity': quantity}],
+        }
+
+    def test_returns_ids_of_created_orders(self):
+        Order.objects.create(firstname='Старый', lastname='Заказ', phonenumber='+79291000000', address='Москва')
+        payload = [self.make_order('Анна', 1), {'firstname': 'Без товаров'}, self.make_order('Пётр', 3)]
+
+        response = self.client.post('/api/orders/bulk/', payload, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        created, invalid, second_created = response.json()
+        self.assertIn('errors', invalid)
+        for result, quantity in [(created, 1), (second_created, 3)]:
+            order = Order.objects.get(id=result['id'])
+            self.assertEqual(order.firstname, result['firstname'])
+            self.assertEqual(order.total_price, self.product.price * quantity)
+            self.assertEqual(order.items.get().quantity, quantity)
+
+    def test_batch_is_inserted_and_refreshed_at_once(self):
+        payload = [self.make_order(f'Покупатель {number}') for number in range(100)]
+        refresh_patcher = mock.patch('foodcartapp.views.refresh_order_candidates', wraps=refresh_order_candidates)
+
+        with refresh_patcher as refresh, CaptureQueriesContext(connection) as queries, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/bulk/', payload, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 30)
+        order_ids = [result['id'] for result in response.json()]
+        refresh.assert_called_once()
+        self.assertEqual(OrderRestaurantCandidate.objects.filter(order_id__in=order_ids).count(), 100)
+
+
+class ImageDerivativesTest(TestCase):
+    def save_product(self, product):
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        product.refresh_from_db()
+
+    def test_derivatives_are_made_once_per_image(self):
+        content = io.BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(content, 'JPEG')
+        image_name = default_storage.save('burger.jpg', ContentFile(content.getvalue()))
+        product = Product(name='Чизбургер', price=100, image=image_name)
+
+        with mock.patch('foodcartapp.receivers.make_image_derivatives_safe', wraps=make_image_derivatives_safe) \
+                as make_derivatives:
+            self.save_product(product)
+            product.name = 'Двойной чизбургер'
+            self.save_product(product)
+
+        make_derivatives.assert_called_once_with(image_name)
+        self.assertEqual(product.image_derivatives['source'], image_name)
+        self.assertEqual(product.image_derivatives['jpeg']['thumb']['width'], 100)
+
+    def test_missing_image_is_reported_once(self):
+        product = Product(name='Чизбургер', price=100, image='missing.jpg')
+
+        with mock.patch('foodcartapp.receivers.error_reporter') as error_reporter:
+            self.save_product(product)
+            product.name = 'Двойной чизбургер'
+            self.save_product(product)
+
+        error_reporter.report_message.assert_called_once()
+        self.assertEqual(product.image_derivatives['source'], 'missing.jpg')
+        self.assertEqual(get_image_urls('missing.jpg', product.image_derivatives)['srcset'], '')
@@ -1,6 +1,7 @@
 from django.urls import path
 
-from .views import product_list_api, banners_list_api, register_order
+from .views import product_list_api, banners_list_api, register_order, register_orders_bulk
+from .views import update_menu_availability, bootstrap_api
 
 
 app_name = "foodcartapp"
@@ -8,5 +9,8 @@ app_name = "foodcartapp"
 urlpatterns = [
     path('products/', product_list_api),
     path('banners/', banners_list_api),
+    path('bootstrap/', bootstrap_api),
     path('order/', register_order),
+    path('orders/bulk/', register_orders_bulk),
+    path('menu/availability/', update_menu_availability),
 ]
@@ -1,63 +1,153 @@
-from django.http import JsonResponse
-from django.templatetags.static import static
-from django.db import transaction
-from rest_framework.decorators import api_view
+from urllib.parse import urlencode
+
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import parse_etags, patch_vary_headers
+from django.db import connection, transaction
+from django.db.models import Max
+from django.views.decorators.gzip import gzip_page
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from .models import Product, Order, OrderItem
-from .serializers import OrderSerializer
+from geo_places.models import Address
+
+from .candidates import refresh_order_candidates
+from .catalog import get_serialized_catalog, get_products_values, iter_serialized_products, MAX_PAGE_SIZE
+from .catalog import get_serialized_banners, get_serialized_bootstrap
+from .models import Product, Order, OrderItem, RestaurantMenuItem
+from .serializers import OrderSerializer, MenuAvailabilitySerializer, collect_product_ids
 
+MAX_BULK_ORDERS = 1000
+MAX_AVAILABILITY_CHANGES = 5000
+BULK_BATCH_SIZE = 500
 
+
+@gzip_page
 def banners_list_api(request):
-    # FIXME move data to db?
-    return JsonResponse([
-        {
-            'title': 'Burger',
-            'src': static('burger.jpg'),
-            'text': 'Tasty Burger at your door step',
-        },
-        {
-            'title': 'Spices',
-            'src': static('food.jpg'),
-            'text': 'All Cuisines',
-        },
-        {
-            'title': 'New York',
-            'src': static('tasty.jpg'),
-            'text': 'Food is incomplete without a tasty dessert',
-        }
-    ], safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    _, content = get_serialized_banners()
+    return HttpResponse(content, content_type='application/json')
+
+
+def parse_accept_encoding(accept_encoding):
+    qualities = {}
+    for coding in accept_encoding.split(','):
+        coding, *params = coding.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        qualities[coding] = quality
+    return qualities
+
+
+def get_accepted_encoding(request, encodings):
+    qualities = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+    default_quality = qualities.get('*', 0)
+    identity_quality = qualities.get('identity', 0)
+
+    encoding = max(encodings, key=lambda encoding: qualities.get(encoding, default_quality))
+    quality = qualities.get(encoding, default_quality)
+    if quality <= 0 or quality < identity_quality:
+        return None
+    return encoding
+
+
+def make_cached_json_response(request, etag, compressed_content, not_modified=False):
+    encoding = get_accepted_encoding(request, compressed_content.encoded)
+    if encoding:
+        etag = f'{etag[:-1]}-{encoding}"'
+
+    if not_modified or etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    elif encoding:
+        response = HttpResponse(compressed_content.encoded[encoding], content_type='application/json')
+        response['Content-Encoding'] = encoding
+    else:
+        response = HttpResponse(compressed_content.content, content_type='application/json')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+@gzip_page
+def stream_product_list(request, output_format):
+    try:
+        cursor = int(request.GET.get('cursor', 0))
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+    except ValueError:
+        return JsonResponse({'error': 'cursor и limit должны быть числами'}, status=400)
+    if cursor < 0:
+        return JsonResponse({'error': 'cursor не может быть отрицательным'}, status=400)
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        return JsonResponse({'error': f'limit должен быть от 1 до {MAX_PAGE_SIZE}'}, status=400)
+
+    products_values = get_products_values(Product.objects.available().filter(id__gt=cursor))
+    next_cursor = None
+    if limit:
+        page_bounds = list(products_values.values_list('id', flat=True)[limit - 1:limit + 1])
+        if len(page_bounds) == 2:
+            next_cursor = page_bounds[0]
+        products_values = products_values[:limit]
+
+    ndjson = output_format == 'ndjson'
+    response = StreamingHttpResponse(
+        iter_serialized_products(products_values, ndjson=ndjson),
+        content_type='application/x-ndjson' if ndjson else 'application/json',
+    )
+    if next_cursor:
+        next_url = request.build_absolute_uri(
+            f'{request.path}?{urlencode({**request.GET.dict(), "cursor": next_cursor})}'
+        )
+        response['X-Next-Cursor'] = next_cursor
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            },
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    output_format = request.GET.get('format', 'json')
+    if output_format not in ('json', 'ndjson'):
+        return JsonResponse({'error': 'format должен быть json или ndjson'}, status=400)
+
+    if output_format == 'ndjson' or request.GET.keys() & {'stream', 'cursor', 'limit'}:
+        return stream_product_list(request, output_format)
+
+    etag, compressed_content = get_serialized_catalog()
+    return make_cached_json_response(request, etag, compressed_content)
+
+
+def bootstrap_api(request):
+    version, compressed_content = get_serialized_bootstrap()
+    return make_cached_json_response(
+        request,
+        f'"{version}"',
+        compressed_content,
+        not_modified=request.GET.get('version') == version,
+    )
+
+
+def serialize_created_order(order):
+    return {
+        'id': order.id,
+        'firstname': order.firstname,
+        'lastname': order.lastname,
+        'phonenumber': str(order.phonenumber),
+        'address': order.address
+    }
+
+
+def calc_total_price(order_items):
+    return sum(item['product'].price * item['quantity'] for item in order_items)
 
 
 @api_view(['POST'])
@@ -71,7 +161,8 @@ def register_order(request):
         firstname=serializer.validated_data['firstname'],
         lastname=serializer.validated_data['lastname'],
         phonenumber=serializer.validated_data['phonenumber'],
-        address=serializer.validated_data['address']
+        address=serializer.validated_data['address'],
+        total_price=calc_total_price(serializer.validated_data['products']),
     )
 
     order_items = [OrderItem(
@@ -82,12 +173,93 @@ def register_order(request):
         ) for product in serializer.validated_data['products']]
 
     OrderItem.objects.bulk_create(order_items)
+    Address.objects.enqueue([order.address])
 
-    order_to_response = {
-        'id': order.id,
-        'firstname': order.firstname,
-        'lastname': order.lastname,
-        'phonenumber': str(order.phonenumber),
-        'address': order.address
+    return Response(serialize_created_order(order))
+
+
+def create_orders(orders):
+    if orders and not connection.features.can_return_rows_from_bulk_insert:
+        # the backend can't return the ids of bulk inserted rows, so they are set here:
+        # if another transaction takes the same ids, the insert fails instead of mixing up orders
+        last_order_id = Order.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        for order_id, order in enumerate(orders, start=last_order_id + 1):
+            order.id = order_id
+    return Order.objects.bulk_create(orders, batch_size=BULK_BATCH_SIZE)
+
+
+@gzip_page
+@api_view(['POST'])
+@transaction.atomic
+def register_orders_bulk(request):
+    if not isinstance(request.data, list):
+        raise ValidationError({'orders': ['Ожидается список заказов.']})
+    if len(request.data) > MAX_BULK_ORDERS:
+        raise ValidationError({'orders': [f'Не больше {MAX_BULK_ORDERS} заказов за раз.']})
+
+    products = Product.objects.only('price').in_bulk(collect_product_ids(request.data))
+    order_serializer = OrderSerializer(context={'products': products})
+
+    orders = []
+    order_items = []
+    results = []
+    for order_data in request.data:
+        try:
+            order_data = order_serializer.run_validation(order_data)
+        except ValidationError as error:
+            results.append({'errors': error.detail})
+            continue
+
+        order = Order(
+            firstname=order_data['firstname'],
+            lastname=order_data['lastname'],
+            phonenumber=order_data['phonenumber'],
+            address=order_data['address'],
+            total_price=calc_total_price(order_data['products']),
+        )
+        orders.append(order)
+        results.append(order)
+        order_items.extend(
+            OrderItem(
+                order=order,
+                product=item['product'],
+                quantity=item['quantity'],
+                price=item['product'].price,
+            ) for item in order_data['products']
+        )
+
+    create_orders(orders)
+    OrderItem.objects.bulk_create(order_items, batch_size=BULK_BATCH_SIZE)
+    Address.objects.enqueue(order.address for order in orders)
+    if orders:
+        created_orders = Order.objects.filter(id__in=[order.id for order in orders])
+        transaction.on_commit(lambda: refresh_order_candidates(created_orders))
+
+    return Response([
+        serialize_created_order(result) if isinstance(result, Order) else result
+        for result in results
+    ])
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@transaction.atomic
+def update_menu_availability(request):
+    serializer = MenuAvailabilitySerializer(data=request.data, many=True, allow_empty=False)
+    serializer.is_valid(raise_exception=True)
+    if len(serializer.validated_data) > MAX_AVAILABILITY_CHANGES:
+        raise ValidationError({'changes': [f'Не больше {MAX_AVAILABILITY_CHANGES} изменений за раз.']})
+
+    availability_by_pair = {
+        (change['restaurant'], change['product']): change['availability']
+        for change in serializer.validated_data
     }
-    return Response(order_to_response)
+    updated_count, missing_pairs = RestaurantMenuItem.objects.bulk_set_availability(availability_by_pair)
+
+    return Response({
+        'updated': updated_count,
+        'not_found': [
+            {'restaurant': restaurant_id, 'product': product_id}
+            for restaurant_id, product_id in sorted(missing_pairs)
+        ],
+    })
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GeoPlacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geo_places'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
@@ -0,0 +1,44 @@
+import numpy as np
+from geopy import distance
+
+EARTH_RADIUS_KM = 6371.0088
+
+HAVERSINE = 'haversine'
+GEODESIC = 'geodesic'
+
+
+def to_coordinates_array(coordinates):
+    return np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+
+
+def calc_haversine_matrix(start_coordinates, end_coordinates):
+    start_lat, start_lon = np.radians(start_coordinates).T
+    end_lat, end_lon = np.radians(end_coordinates).T
+
+    delta_lat = end_lat[np.newaxis, :] - start_lat[:, np.newaxis]
+    delta_lon = end_lon[np.newaxis, :] - start_lon[:, np.newaxis]
+
+    a = (
+        np.sin(delta_lat / 2) ** 2
+        + np.cos(start_lat)[:, np.newaxis] * np.cos(end_lat)[np.newaxis, :] * np.sin(delta_lon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def calc_geodesic_matrix(start_coordinates, end_coordinates):
+    distances = np.empty((len(start_coordinates), len(end_coordinates)))
+    for row, start_point in enumerate(start_coordinates):
+        for column, end_point in enumerate(end_coordinates):
+            distances[row, column] = distance.geodesic(start_point, end_point).km
+    return distances
+
+
+def calc_distance_matrix(start_coordinates, end_coordinates, mode=HAVERSINE):
+    start_coordinates = to_coordinates_array(start_coordinates)
+    end_coordinates = to_coordinates_array(end_coordinates)
+
+    if mode == HAVERSINE:
+        return calc_haversine_matrix(start_coordinates, end_coordinates)
+    if mode == GEODESIC:
+        return calc_geodesic_matrix(start_coordinates, end_coordinates)
+    raise ValueError(f'Unknown distance mode: {mode}')
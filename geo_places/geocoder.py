@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from geo_places.models import Address
+from geo_places.signals import addresses_geocoded
+
+CACHE_STATS_KEYS = ('hits', 'negative_hits', 'misses')
+
+
+def fetch_coordinates_safe(address):
+    try:
+        return Address.fetch_coordinates(address)
+    except (requests.RequestException, KeyError, ValueError):
+        return None
+
+
+def increment_stat(name, delta):
+    if not delta:
+        return
+    key = f'geocoder:{name}'
+    cache.add(key, 0, timeout=None)
+    cache.incr(key, delta)
+
+
+def get_cache_stats():
+    stats = cache.get_many([f'geocoder:{name}' for name in CACHE_STATS_KEYS])
+    return {name: stats.get(f'geocoder:{name}', 0) for name in CACHE_STATS_KEYS}
+
+
+def lookup_addresses(titles):
+    titles = {title for title in titles if title}
+    addresses = Address.objects.get_by_titles(titles)
+    Address.objects.enqueue(titles - addresses.keys())
+
+    increment_stat('hits', sum(address.is_resolved for address in addresses.values()))
+    increment_stat('negative_hits', sum(address.is_not_found for address in addresses.values()))
+    increment_stat('misses', len(titles - addresses.keys()))
+    return addresses
+
+
+def geocode_pending_addresses(batch_size=100, max_workers=None):
+    addresses = list(Address.objects.pending()[:batch_size])
+    if not addresses:
+        return 0
+
+    max_workers = max_workers or settings.GEOCODER_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        found_coordinates = executor.map(
+            fetch_coordinates_safe,
+            [address.title for address in addresses],
+        )
+
+        resolved_keys = set()
+        for address, coordinates in zip(addresses, found_coordinates):
+            address.requested_at = timezone.now()
+            if coordinates:
+                address.lon, address.lat = coordinates
+                resolved_keys.add(address.key)
+
+    Address.objects.bulk_update(addresses, ['lat', 'lon', 'requested_at'])
+    if resolved_keys:
+        addresses_geocoded.send(sender=Address, keys=resolved_keys)
+    return len(resolved_keys)
@@ -0,0 +1,51 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from geo_places.distances import calc_distance_matrix, HAVERSINE, GEODESIC
+from geo_places.models import Address
+
+
+def generate_addresses(count):
+    return [
+        Address(
+            title=f'address {number}',
+            lat=Decimal(str(random.uniform(55.55, 55.95))),
+            lon=Decimal(str(random.uniform(37.35, 37.85))),
+        )
+        for number in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает попарный расчёт расстояний с векторным'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000)
+        parser.add_argument('--restaurants', type=int, default=50)
+
+    def measure(self, title, calculate):
+        started_at = time.perf_counter()
+        calculate()
+        self.stdout.write(f'{title}: {time.perf_counter() - started_at:.3f} с')
+
+    def handle(self, *args, **options):
+        order_addresses = generate_addresses(options['orders'])
+        restaurant_addresses = generate_addresses(options['restaurants'])
+        order_coordinates = [(address.lat, address.lon) for address in order_addresses]
+        restaurant_coordinates = [(address.lat, address.lon) for address in restaurant_addresses]
+
+        self.stdout.write(f'{options["orders"]} заказов x {options["restaurants"]} ресторанов')
+        self.measure('Address.calc_distance попарно', lambda: [
+            Address.calc_distance(restaurant_address, order_address)
+            for order_address in order_addresses
+            for restaurant_address in restaurant_addresses
+        ])
+        self.measure('Матрица, haversine', lambda: calc_distance_matrix(
+            order_coordinates, restaurant_coordinates, mode=HAVERSINE,
+        ))
+        self.measure('Матрица, geodesic', lambda: calc_distance_matrix(
+            order_coordinates, restaurant_coordinates, mode=GEODESIC,
+        ))
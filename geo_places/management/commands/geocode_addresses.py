@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from geo_places.geocoder import geocode_pending_addresses, get_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Определяет координаты адресов, ожидающих геокодирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--loop', action='store_true', help='работать постоянно как фоновый воркер')
+        parser.add_argument('--interval', type=float, default=5, help='пауза между проходами в секундах')
+        parser.add_argument('--stats', action='store_true', help='показать статистику кеша адресов и выйти')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            stats = get_cache_stats()
+            self.stdout.write(
+                f'Найдены в кеше: {stats["hits"]}, '
+                f'не найдены геокодером: {stats["negative_hits"]}, '
+                f'новые адреса: {stats["misses"]}'
+            )
+            return
+
+        while True:
+            resolved_count = geocode_pending_addresses(
+                batch_size=options['batch_size'],
+                max_workers=options['workers'],
+            )
+            if resolved_count:
+                self.stdout.write(f'Найдены координаты для {resolved_count} адресов')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,62 @@
+import re
+
+from django.db import migrations, models
+
+
+def normalize_title(title):
+    words = re.sub(r'[^\w]+', ' ', title.lower().replace('ё', 'е')).split()
+    return ' '.join(words)
+
+
+def fill_address_keys(apps, schema_editor):
+    Address = apps.get_model('geo_places', 'Address')
+
+    addresses_by_key = {}
+    duplicate_ids = []
+    for address in Address.objects.order_by('lat', 'id'):
+        key = normalize_title(address.title)
+        kept_address = addresses_by_key.get(key)
+        if kept_address and kept_address.lat is not None:
+            duplicate_ids.append(address.id)
+            continue
+        if kept_address:
+            duplicate_ids.append(kept_address.id)
+        address.key = key
+        addresses_by_key[key] = address
+
+    Address.objects.filter(id__in=duplicate_ids).delete()
+    for address in addresses_by_key.values():
+        if address.lat is None:
+            address.requested_at = None
+    Address.objects.bulk_update(addresses_by_key.values(), ['key', 'requested_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo_places', '0003_auto_20211130_2008'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='requested_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='дата запроса'),
+        ),
+        migrations.AlterField(
+            model_name='address',
+            name='title',
+            field=models.CharField(max_length=100, verbose_name='название'),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='key',
+            field=models.CharField(editable=False, max_length=100, null=True, verbose_name='нормализованный адрес'),
+        ),
+        migrations.RunPython(fill_address_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='address',
+            name='key',
+            field=models.CharField(editable=False, max_length=100, unique=True, verbose_name='нормализованный адрес'),
+        ),
+    ]
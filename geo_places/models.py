@@ -1,16 +1,56 @@
+import re
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.conf import settings
 import requests
 from geopy import distance
-import rollbar
+
+from star_burger.error_reporting import error_reporter
+
+
+class AddressQuerySet(models.QuerySet):
+    def pending(self):
+        now = timezone.now()
+        outdated = Q(requested_at__isnull=True) | Q(
+            lat__isnull=True,
+            requested_at__lt=now - timedelta(seconds=settings.GEOCODER_RETRY_TTL),
+        )
+        if settings.GEOCODER_CACHE_TTL:
+            outdated |= Q(
+                lat__isnull=False,
+                requested_at__lt=now - timedelta(seconds=settings.GEOCODER_CACHE_TTL),
+            )
+        return self.filter(outdated).order_by(models.F('requested_at').asc(nulls_first=True))
+
+    def enqueue(self, titles):
+        addresses = {}
+        for title in titles:
+            key = Address.normalize_title(title)
+            if key:
+                addresses.setdefault(key, Address(key=key, title=title))
+        return self.bulk_create(addresses.values(), ignore_conflicts=True)
+
+    def get_by_titles(self, titles):
+        keys = {title: Address.normalize_title(title) for title in titles}
+        addresses = self.in_bulk(set(keys.values()), field_name='key')
+        return {
+            title: addresses[key]
+            for title, key in keys.items()
+            if key in addresses
+        }
 
 
 class Address(models.Model):
-    title = models.CharField(max_length=100, unique=True, verbose_name='название')
+    title = models.CharField(max_length=100, verbose_name='название')
+    key = models.CharField(max_length=100, unique=True, editable=False, verbose_name='нормализованный адрес')
     lat = models.DecimalField(max_digits=22, decimal_places=16, blank=True, null=True, verbose_name='широта')
     lon = models.DecimalField(max_digits=22, decimal_places=16, blank=True, null=True, verbose_name='долгота')
-    requested_at = models.DateTimeField(default=timezone.now, verbose_name='дата создания')
+    requested_at = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name='дата запроса')
+
+    objects = AddressQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Адрес'
@@ -19,19 +59,31 @@ class Address(models.Model):
     def __str__(self):
         return self.title
 
+    @property
+    def is_resolved(self):
+        return self.lat is not None and self.lon is not None
+
+    @property
+    def is_not_found(self):
+        return not self.is_resolved and self.requested_at is not None
+
+    @staticmethod
+    def normalize_title(title):
+        words = re.sub(r'[^\w]+', ' ', title.lower().replace('ё', 'е')).split()
+        return ' '.join(words)
+
     @staticmethod
     def fetch_coordinates(address):
-        base_url = "https://geocode-maps.yandex.ru/1.x"
-        response = requests.get(base_url, params={
+        response = requests.get(settings.YANDEX_GEOCODER_URL, params={
             "geocode": address,
             "apikey": settings.YANDEX_APIKEY,
             "format": "json",
-        })
+        }, timeout=settings.YANDEX_GEOCODER_TIMEOUT)
 
         try:
             response.raise_for_status()
         except requests.HTTPError:
-            rollbar.report_message('Can\'t fetch coordinates', 'warning')
+            error_reporter.report_message('Can\'t fetch coordinates', 'warning')
             return None
 
         found_places = response.json()['response']['GeoObjectCollection']['featureMember']
@@ -49,7 +101,8 @@ class Address(models.Model):
         try:
             distance_points = abs(round(distance.distance((end_pos.lat, end_pos.lon), (start_pos.lat, start_pos.lon)).km, 2))
         except ValueError as error:
-            rollbar.report_message('Can\'t calculate distance', 'warning')
-            print(f'Error during calculating distance: {error}')
+            error_reporter.report_message('Can\'t calculate distance', 'warning', extra_data={
+                'error': str(error),
+            })
         return distance_points
 
@@ -0,0 +1,9 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import Address
+
+
+@receiver(pre_save, sender=Address)
+def fill_address_key(sender, instance, **kwargs):
+    instance.key = Address.normalize_title(instance.title)
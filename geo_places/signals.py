@@ -0,0 +1,3 @@
+from django.dispatch import Signal
+
+addresses_geocoded = Signal()
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from star_burger.testing import StubHandler, start_stub_server
+
+from .geocoder import geocode_pending_addresses, lookup_addresses
+from .models import Address
+from .signals import addresses_geocoded
+
+STUB_COORDINATES = {
+    'Москва, Арбат 15': ('37.593', '55.750'),
+    'Москва, Тверская 7': ('37.612', '55.758'),
+}
+BROKEN_ADDRESS = 'Москва, Сломанная 500'
+
+
+class StubGeocoderHandler(StubHandler):
+    def do_GET(self):
+        address = parse_qs(urlparse(self.path).query)['geocode'][0]
+        self.server.requested.append(address)
+        if address == BROKEN_ADDRESS:
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        found_places = []
+        if address in STUB_COORDINATES:
+            lon, lat = STUB_COORDINATES[address]
+            found_places.append({'GeoObject': {'Point': {'pos': f'{lon} {lat}'}}})
+        self.send_json({'response': {'GeoObjectCollection': {'featureMember': found_places}}})
+
+
+class GeocoderTest(TestCase):
+    def setUp(self):
+        self.server = start_stub_server(self, StubGeocoderHandler)
+        self.server.requested = []
+
+        settings_override = override_settings(
+            YANDEX_GEOCODER_URL=f'http://127.0.0.1:{self.server.server_port}/1.x',
+            GEOCODER_RETRY_TTL=60 * 60,
+            GEOCODER_CACHE_TTL=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_lookup_enqueues_unknown_addresses_without_requests(self):
+        addresses = lookup_addresses(['Москва, Арбат 15', ''])
+
+        self.assertEqual(addresses, {})
+        self.assertEqual(list(Address.objects.values_list('key', flat=True)), ['москва арбат 15'])
+        self.assertEqual(self.server.requested, [])
+
+    def test_lookup_matches_normalized_titles(self):
+        Address.objects.create(title='Москва, Арбат 15', lat='55.75', lon='37.593')
+
+        addresses = lookup_addresses(['москва,  арбат, 15'])
+
+        self.assertTrue(addresses['москва,  арбат, 15'].is_resolved)
+        self.assertEqual(Address.objects.count(), 1)
+
+    def test_geocodes_pending_addresses(self):
+        Address.objects.enqueue(['Москва, Арбат 15', 'Москва, Тверская 7'])
+        receiver = mock.Mock()
+        addresses_geocoded.connect(receiver)
+        self.addCleanup(addresses_geocoded.disconnect, receiver)
+
+        self.assertEqual(geocode_pending_addresses(max_workers=2), 2)
+
+        address = Address.objects.get(key='москва арбат 15')
+        self.assertEqual((float(address.lon), float(address.lat)), (37.593, 55.75))
+        self.assertEqual(receiver.call_args.kwargs['keys'], {'москва арбат 15', 'москва тверская 7'})
+        self.assertFalse(Address.objects.pending().exists())
+
+    def test_not_found_address_is_not_retried_before_ttl(self):
+        Address.objects.enqueue(['Нигде, 1'])
+
+        self.assertEqual(geocode_pending_addresses(), 0)
+        self.assertEqual(geocode_pending_addresses(), 0)
+
+        self.assertEqual(self.server.requested, ['Нигде, 1'])
+        self.assertTrue(Address.objects.get().is_not_found)
+
+    def test_geocoder_error_marks_address_requested(self):
+        Address.objects.enqueue([BROKEN_ADDRESS])
+
+        with mock.patch('geo_places.models.error_reporter') as error_reporter:
+            self.assertEqual(geocode_pending_addresses(), 0)
+
+        error_reporter.report_message.assert_called_once()
+        self.assertTrue(Address.objects.get().is_not_found)
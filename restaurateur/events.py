@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LAST_EVENT_ID_KEY = 'order_events:last_id'
+EVENT_TTL = 5 * 60
+MAX_EVENTS_BACKLOG = 100
+KEEPALIVE_INTERVAL = 15
+MISSING_EVENT_WAIT = 10
+
+
+def get_event_key(event_id):
+    return f'order_events:{event_id}'
+
+
+def get_last_event_id():
+    return cache.get(LAST_EVENT_ID_KEY, 0)
+
+
+def publish_orders_event(order_ids):
+    cache.add(LAST_EVENT_ID_KEY, 0, timeout=None)
+    event_id = cache.incr(LAST_EVENT_ID_KEY)
+    cache.set(get_event_key(event_id), {'order_ids': sorted(order_ids)}, timeout=EVENT_TTL)
+    return event_id
+
+
+def read_orders_events(after_event_id):
+    last_event_id = get_last_event_id()
+    if last_event_id <= after_event_id:
+        return after_event_id, [], None
+
+    first_event_id = max(after_event_id + 1, last_event_id - MAX_EVENTS_BACKLOG + 1)
+    event_ids = range(first_event_id, last_event_id + 1)
+    events = cache.get_many([get_event_key(event_id) for event_id in event_ids])
+
+    read_events = []
+    for event_id in event_ids:
+        event_key = get_event_key(event_id)
+        if event_key not in events:
+            return event_id - 1, read_events, event_id
+        read_events.append((event_id, events[event_key]))
+    return last_event_id, read_events, None
+
+
+def iter_orders_events_stream(last_event_id):
+    started_at = last_sent_at = time.monotonic()
+    missing_event_id = missing_since = None
+    yield 'retry: 3000\n\n'
+
+    while time.monotonic() - started_at < settings.ORDER_EVENTS_STREAM_DURATION:
+        last_event_id, events, first_missing_event_id = read_orders_events(last_event_id)
+        for event_id, event in events:
+            yield f'id: {event_id}\ndata: {json.dumps(event)}\n\n'
+            last_sent_at = time.monotonic()
+
+        # the id is taken before the event is written, so a missing event may still appear
+        if first_missing_event_id != missing_event_id:
+            missing_event_id, missing_since = first_missing_event_id, time.monotonic()
+        elif missing_event_id and time.monotonic() - missing_since > MISSING_EVENT_WAIT:
+            last_event_id = missing_event_id
+            missing_event_id = None
+
+        if time.monotonic() - last_sent_at > KEEPALIVE_INTERVAL:
+            yield ': ping\n\n'
+            last_sent_at = time.monotonic()
+        time.sleep(settings.ORDER_EVENTS_POLL_INTERVAL)
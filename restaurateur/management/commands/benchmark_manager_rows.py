@@ -0,0 +1,113 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Prefetch
+
+from foodcartapp.models import Product, Restaurant, RestaurantMenuItem, Order, OrderRestaurantCandidate
+from restaurateur.rows import get_product_rows, get_cached_product_rows, get_order_rows
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_product_instances(restaurant_ids):
+    products = []
+    for product in Product.objects.select_related('category').prefetch_related('menu_items'):
+        availability = {item.restaurant_id: item.availability for item in product.menu_items.all()}
+        products.append((product, [availability.get(restaurant_id, False) for restaurant_id in restaurant_ids]))
+    return products
+
+
+def get_order_instances(orders):
+    candidates = OrderRestaurantCandidate.objects.select_related('restaurant').order_by(
+        F('distance').asc(nulls_last=True),
+    )
+    orders = list(orders.prefetch_related(Prefetch('restaurant_candidates', queryset=candidates)))
+    for order in orders:
+        order.restaurants = [
+            (candidate.restaurant, candidate.distance)
+            for candidate in order.restaurant_candidates.all()[:10]
+        ]
+    return orders
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает модели и лёгкие строки для страниц менеджера по времени и памяти. Данные не сохраняются'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--restaurants', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                restaurant_ids, orders = self.fill_data(options)
+                self.measure('товары: модели', lambda: get_product_instances(restaurant_ids), options['repeat'])
+                self.measure('товары: строки', lambda: get_product_rows(restaurant_ids), options['repeat'])
+                self.measure('товары: из кеша', lambda: get_cached_product_rows(restaurant_ids), options['repeat'])
+                self.measure('заказы: модели', lambda: get_order_instances(orders), options['repeat'])
+                self.measure('заказы: строки', lambda: get_order_rows(orders), options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill_data(self, options):
+        last_restaurant_id = Restaurant.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        last_product_id = Product.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        last_order_id = Order.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+        Restaurant.objects.bulk_create(
+            Restaurant(name=f'Ресторан {number}') for number in range(options['restaurants'])
+        )
+        Product.objects.bulk_create(
+            (Product(name=f'Товар {number}', price=100, image='burger.jpg') for number in range(options['rows'])),
+            batch_size=1000,
+        )
+        Order.objects.bulk_create(
+            (
+                Order(firstname='Иван', lastname='Иванов', phonenumber='+79291000000', address='Москва')
+                for _ in range(options['rows'])
+            ),
+            batch_size=1000,
+        )
+        restaurant_ids = list(Restaurant.objects.filter(id__gt=last_restaurant_id).values_list('id', flat=True))
+        product_ids = Product.objects.filter(id__gt=last_product_id).values_list('id', flat=True)
+        orders = Order.objects.filter(id__gt=last_order_id).order_by('-created_at', '-id')
+
+        RestaurantMenuItem.objects.bulk_create(
+            (
+                RestaurantMenuItem(restaurant_id=restaurant_id, product_id=product_id, availability=random.random() < 0.5)
+                for product_id in product_ids
+                for restaurant_id in restaurant_ids
+            ),
+            batch_size=5000,
+        )
+        OrderRestaurantCandidate.objects.bulk_create(
+            (
+                OrderRestaurantCandidate(order_id=order_id, restaurant_id=restaurant_id, distance=random.randint(1, 30))
+                for order_id in orders.values_list('id', flat=True)
+                for restaurant_id in random.sample(restaurant_ids, 10)
+            ),
+            batch_size=5000,
+        )
+        return restaurant_ids, orders
+
+    def measure(self, title, build_rows, repeat):
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            build_rows()
+        elapsed = (time.perf_counter() - started_at) / repeat
+
+        tracemalloc.start()
+        rows = build_rows()
+        rows_size, peak_size = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{title}: {len(rows)} строк, {elapsed * 1000:.0f} мс, '
+            f'память {rows_size / 2 ** 20:.1f} МБ, пик {peak_size / 2 ** 20:.1f} МБ'
+        )
@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+
+from foodcartapp.signals import orders_changed
+
+from .events import publish_orders_event
+
+
+@receiver(orders_changed)
+def publish_changed_orders(sender, order_ids, **kwargs):
+    publish_orders_event(order_ids)
@@ -0,0 +1,127 @@
+from collections import defaultdict, namedtuple
+
+from django.db.models import F
+
+from foodcartapp.catalog import VersionedCache, get_catalog_version
+from foodcartapp.models import Product, Order, RestaurantMenuItem, OrderRestaurantCandidate
+from geo_places.models import Address
+
+MAX_ORDER_RESTAURANTS = 10
+
+
+ProductRow = namedtuple('ProductRow', [
+    'id',
+    'name',
+    'category',
+    'price',
+    'image_url',
+    'availability',
+])
+
+OrderRow = namedtuple('OrderRow', [
+    'id',
+    'created_at',
+    'status',
+    'payment_method',
+    'price',
+    'firstname',
+    'lastname',
+    'phonenumber',
+    'address',
+    'comment',
+    'geocoding_pending',
+    'restaurants',
+])
+
+ORDER_FIELDS = [
+    'id',
+    'created_at',
+    'status',
+    'payment_method',
+    'total_price',
+    'firstname',
+    'lastname',
+    'phonenumber',
+    'address',
+    'comment',
+]
+
+
+def get_availability_masks(restaurant_ids):
+    restaurant_positions = {restaurant_id: position for position, restaurant_id in enumerate(restaurant_ids)}
+    menu_items = RestaurantMenuItem.objects.filter(
+        availability=True,
+        restaurant_id__in=restaurant_ids,
+    ).values_list('product_id', 'restaurant_id')
+
+    availability_masks = defaultdict(int)
+    for product_id, restaurant_id in menu_items:
+        availability_masks[product_id] |= 1 << restaurant_positions[restaurant_id]
+    return availability_masks
+
+
+def get_product_rows(restaurant_ids):
+    availability_masks = get_availability_masks(restaurant_ids)
+    availability_by_mask = {}
+    image_storage = Product._meta.get_field('image').storage
+    products = Product.objects.order_by('id').values_list('id', 'name', 'category__name', 'price', 'image')
+
+    product_rows = []
+    for product_id, name, category, price, image in products:
+        availability_mask = availability_masks.get(product_id, 0)
+        if availability_mask not in availability_by_mask:
+            availability_by_mask[availability_mask] = tuple(
+                bool(availability_mask >> position & 1) for position in range(len(restaurant_ids))
+            )
+        product_rows.append(ProductRow(
+            id=product_id,
+            name=name,
+            category=category or '',
+            price=price,
+            image_url=image_storage.url(image),
+            availability=availability_by_mask[availability_mask],
+        ))
+    return product_rows
+
+
+product_rows = VersionedCache(get_product_rows)
+
+
+def get_cached_product_rows(restaurant_ids):
+    restaurant_ids = tuple(restaurant_ids)
+    return product_rows.get((get_catalog_version(), restaurant_ids), restaurant_ids)
+
+
+def get_order_restaurants(order_ids):
+    candidates = OrderRestaurantCandidate.objects.filter(order_id__in=order_ids)\
+        .order_by('order_id', F('distance').asc(nulls_last=True))\
+        .values_list('order_id', 'restaurant__name', 'distance')
+
+    order_restaurants = defaultdict(list)
+    for order_id, restaurant_name, distance in candidates:
+        if len(order_restaurants[order_id]) < MAX_ORDER_RESTAURANTS:
+            order_restaurants[order_id].append((restaurant_name, distance))
+    return order_restaurants
+
+
+def is_geocoding_pending(address):
+    return address is None or not (address.is_resolved or address.is_not_found)
+
+
+def get_order_rows(orders):
+    statuses = dict(Order.ORDER_STATUSES)
+    payment_methods = dict(Order.PAYMENT_METHODS)
+
+    orders = [OrderRow(*order, geocoding_pending=False, restaurants=[]) for order in orders.values_list(*ORDER_FIELDS)]
+    order_restaurants = get_order_restaurants([order.id for order in orders])
+    addresses = Address.objects.get_by_titles({order.address for order in orders})
+
+    return [
+        order._replace(
+            status=statuses.get(order.status, order.status),
+            payment_method=payment_methods.get(order.payment_method, order.payment_method),
+            geocoding_pending=is_geocoding_pending(addresses.get(order.address)),
+            restaurants=order_restaurants[order.id],
+        )
+        for order in orders
+    ]
@@ -1,3 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from foodcartapp.models import Order, OrderItem, OrderRestaurantCandidate, Product, Restaurant, RestaurantMenuItem
+from geo_places.models import Address
+
+from .rows import get_order_rows, get_product_rows
+
+
+class ProductRowsTest(TestCase):
+    def test_availability_follows_restaurant_order(self):
+        first, second, third = [Restaurant.objects.create(name=f'Star Burger {number}') for number in range(3)]
+        burger = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+        cola = Product.objects.create(name='Кола', price=50, image='cola.jpg')
+        RestaurantMenuItem.objects.create(restaurant=first, product=burger)
+        RestaurantMenuItem.objects.create(restaurant=third, product=burger)
+        RestaurantMenuItem.objects.create(restaurant=second, product=cola, availability=False)
+
+        burger_row, cola_row = get_product_rows([first.id, second.id, third.id])
+
+        self.assertEqual(burger_row.availability, (True, False, True))
+        self.assertEqual(cola_row.availability, (False, False, False))
+        self.assertEqual(get_product_rows([third.id, first.id])[0].availability, (True, True))
+
+
+class OrderRowsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name='Star Burger Арбат', address='Москва, Арбат 15')
+        cls.product = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+
+    def create_order(self, address):
+        order = Order.objects.create(firstname='Иван', lastname='Иванов', phonenumber='+79291000000', address=address)
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, price=self.product.price)
+        return order
+
+    def test_row_fields(self):
+        order = self.create_order('Москва, Тверская 1')
+        OrderRestaurantCandidate.objects.create(order=order, restaurant=self.restaurant, distance=1.5)
+
+        order_row, = get_order_rows(Order.objects.all())
+
+        self.assertEqual(order_row.id, order.id)
+        self.assertEqual(order_row.status, 'Необработанный')
+        self.assertEqual(order_row.price, 200)
+        self.assertEqual(order_row.restaurants, [('Star Burger Арбат', 1.5)])
+
+    def test_geocoding_pending_follows_order_address(self):
+        Address.objects.create(title='Москва, Тверская 1', lat=55.76, lon=37.61)
+        Address.objects.create(title='Нигде, 1', requested_at='2021-01-01T00:00:00Z')
+        Address.objects.enqueue(['Москва, Тверская 2'])
+        resolved = self.create_order('москва, тверская 1')
+        not_found = self.create_order('Нигде, 1')
+        queued = self.create_order('Москва, Тверская 2')
+        unknown = self.create_order('Москва, Тверская 3')
+        OrderRestaurantCandidate.objects.create(order=resolved, restaurant=self.restaurant, distance=None)
+
+        rows = {row.id: row for row in get_order_rows(Order.objects.all())}
+
+        self.assertFalse(rows[resolved.id].geocoding_pending)
+        self.assertFalse(rows[not_found.id].geocoding_pending)
+        self.assertTrue(rows[queued.id].geocoding_pending)
+        self.assertTrue(rows[unknown.id].geocoding_pending)
+
+
+class OrdersBoardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager', is_staff=True)
+        cls.product = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def create_order(self, status):
+        return Order.objects.create(
+            firstname='Иван', lastname='Иванов', phonenumber='+79291000000', address='Москва', status=status,
+        )
+
+    def run_on_commit_callbacks(self, action):
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = action()
+        while callbacks:
+            with self.captureOnCommitCallbacks() as new_callbacks:
+                callbacks.pop(0)()
+            callbacks.extend(new_callbacks)
+        return result
+
+    def test_refresh_keeps_default_status_filter(self):
+        waiting_order = self.create_order('waiting')
+        done_order = self.create_order('done')
+
+        response = self.client.get('/manager/orders/', {'ids': f'{waiting_order.id},{done_order.id}'})
+
+        self.assertContains(response, f'data-order-id="{waiting_order.id}"')
+        self.assertNotContains(response, f'data-order-id="{done_order.id}"')
+        self.assertContains(response, f'data-removed-order-ids="{done_order.id}"')
+
+    def test_refresh_with_all_statuses(self):
+        done_order = self.create_order('done')
+
+        response = self.client.get('/manager/orders/', {'status': '', 'ids': done_order.id})
+
+        self.assertContains(response, f'data-order-id="{done_order.id}"')
+        self.assertNotContains(response, 'data-removed-order-ids')
+
+    def test_order_changes_are_published_once(self):
+        with mock.patch('restaurateur.receivers.publish_orders_event') as publish_orders_event:
+            response = self.run_on_commit_callbacks(lambda: self.client.post('/api/order/', {
+                'firstname': 'Иван',
+                'lastname': 'Иванов',
+                'phonenumber': '+79291000000',
+                'address': 'Москва, Тверская 1',
+                'products': [{'product': self.product.id, 'quantity': 1}],
+            }, content_type='application/json'))
+            order = Order.objects.get(id=response.json()['id'])
+            publish_orders_event.assert_called_once_with([order.id])
+
+            publish_orders_event.reset_mock()
+            order.status = 'done'
+            self.run_on_commit_callbacks(order.save)
+            publish_orders_event.assert_called_once_with([order.id])
@@ -1,14 +1,20 @@
 from django import forms
-from django.db.models import Subquery, OuterRef, Prefetch
+from django.db.models import OuterRef, Q, Exists
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.views import View
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
+from django.utils.dateparse import parse_datetime
 
-from foodcartapp.models import Product, Restaurant, Order, RestaurantMenuItem, OrderItem
-from geo_places.models import Address
+from foodcartapp.models import Restaurant, Order, OrderRestaurantCandidate
+
+from .events import get_last_event_id, iter_orders_events_stream
+from .rows import get_cached_product_rows, get_order_rows
+
+ORDERS_PAGE_SIZE = 50
 
 
 class Login(forms.Form):
@@ -28,6 +34,37 @@ class Login(forms.Form):
     )
 
 
+class OrdersFilter(forms.Form):
+    status = forms.ChoiceField(
+        label='Статус', required=False,
+        choices=[('', 'Все')] + Order.ORDER_STATUSES,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    payment_method = forms.ChoiceField(
+        label='Способ оплаты', required=False,
+        choices=[('', 'Все')] + Order.PAYMENT_METHODS,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    restaurant = forms.ModelChoiceField(
+        label='Ресторан', required=False,
+        queryset=Restaurant.objects.order_by('name'),
+        empty_label='Все',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_cursor(self):
+        cursor = self.cleaned_data['cursor']
+        if not cursor:
+            return None
+
+        created_at, _, order_id = cursor.rpartition('_')
+        created_at = parse_datetime(created_at)
+        if not created_at or not order_id.isdigit():
+            raise forms.ValidationError('Неверный курсор')
+        return created_at, int(order_id)
+
+
 class LoginView(View):
     def get(self, request, *args, **kwargs):
         form = Login()
@@ -66,24 +103,9 @@ def is_manager(user):
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
     restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
-
-    default_availability = {restaurant.id: False for restaurant in restaurants}
-    products_with_restaurants = []
-    for product in products:
-
-        availability = {
-            **default_availability,
-            **{item.restaurant_id: item.availability for item in product.menu_items.all()},
-        }
-        orderer_availability = [availability[restaurant.id] for restaurant in restaurants]
-
-        products_with_restaurants.append(
-            (product, orderer_availability)
-        )
 
     return render(request, template_name="products_list.html", context={
-        'products_with_restaurants': products_with_restaurants,
+        'products': get_cached_product_rows([restaurant.id for restaurant in restaurants]),
         'restaurants': restaurants,
     })
 
@@ -95,87 +117,86 @@ def view_restaurants(request):
     })
 
 
-def serialize_order(order):
-    return {
-        'id': order.id,
-        'status': order.get_status_display(),
-        'price': order.price,
-        'payment_method': order.get_payment_method_display(),
-        'firstname': order.firstname,
-        'lastname': order.lastname,
-        'phonenumber': order.phonenumber,
-        'address': order.address,
-        'comment': order.comment,
-        'restaurants': sorted(order.restaurants, key=lambda x: x.order_distance)[:10],
-    }
+def make_orders_cursor(order):
+    return f'{order.created_at.isoformat()}_{order.id}'
 
 
-def create_address(address):
-    address_to_create = None
-    coordinates = Address.fetch_coordinates(address)
-
-    if coordinates:
-        lon, lat = coordinates
-        address_to_create = Address(
-            title=address,
-            lon=lon,
-            lat=lat
+def filter_orders(orders, filters):
+    if filters['status']:
+        orders = orders.filter(status=filters['status'])
+    if filters['payment_method']:
+        orders = orders.filter(payment_method=filters['payment_method'])
+    if filters['restaurant']:
+        restaurant_candidates = OrderRestaurantCandidate.objects.filter(
+            order=OuterRef('pk'),
+            restaurant=filters['restaurant'],
         )
-    return address_to_create
-
+        orders = orders.filter(Q(restaurant=filters['restaurant']) | Exists(restaurant_candidates))
+    if filters['cursor']:
+        created_at, order_id = filters['cursor']
+        orders = orders.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_id))
+    return orders
 
-@user_passes_test(is_manager, login_url='restaurateur:login')
-def view_orders(request):
 
-    addresses = {address.title: address for address in Address.objects.all()}
+def parse_order_ids(order_ids):
+    return [int(order_id) for order_id in order_ids.split(',') if order_id.isdigit()][:ORDERS_PAGE_SIZE]
 
-    orders = Order.objects.select_related('restaurant')\
-        .annotate_with_order_price()\
-        .filter(status='waiting')
 
-    menu_items = list(RestaurantMenuItem.objects.select_related('restaurant')\
-        .select_related('product')\
-        .filter(availability=True))
-
-    addresses_to_create = []
-
-    for order in orders:
-        order.restaurants = []
-        available_restaurants = []
-
-        for item in order.items.all():
-            item_restaurants = [menu_item.restaurant for menu_item in menu_items if item.product == menu_item.product]
-            available_restaurants.extend(item_restaurants)
-
-        available_restaurants = list(set(available_restaurants))
-        order_db_address = addresses.get(order.address)
-
-        if not order_db_address:
-            order_db_address = create_address(order.address)
-            if order_db_address:
-                addresses_to_create.append(order_db_address)
-
-        for restaurant in available_restaurants:
-            if not restaurant.address:
-                continue
-
-            restaurant_db_address = addresses.get(restaurant.address)
-            if not restaurant_db_address:
-                restaurant_db_address = create_address(restaurant.address)
-
-                if not restaurant_db_address:
-                    continue
-
-                addresses_to_create.append(restaurant_db_address)
-                addresses[restaurant_db_address.title] = restaurant_db_address
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_orders(request):
+    filters_query = request.GET.copy()
+    filters_query.setdefault('status', 'waiting')
+    filters_form = OrdersFilter(filters_query)
+    if not filters_form.is_valid():
+        filters_form = OrdersFilter({'status': 'waiting'})
+        filters_form.is_valid()
+
+    orders = filter_orders(Order.objects.all(), filters_form.cleaned_data).order_by('-created_at', '-id')
+
+    if 'ids' in request.GET:
+        board_query = request.GET.copy()
+        del board_query['ids']
+        order_ids = parse_order_ids(request.GET['ids'])
+        orders = get_order_rows(orders.filter(id__in=order_ids))
+        found_order_ids = {order.id for order in orders}
+        return render(request, template_name='order_rows.html', context={
+            'orders': orders,
+            'removed_order_ids': [order_id for order_id in order_ids if order_id not in found_order_ids],
+            'board_url': f'{request.path}?{board_query.urlencode()}',
+        })
 
-            order_distance = Address.calc_distance(restaurant_db_address, order_db_address)
+    orders = get_order_rows(orders[:ORDERS_PAGE_SIZE + 1])
+
+    next_page_url = None
+    if len(orders) > ORDERS_PAGE_SIZE:
+        orders = orders[:ORDERS_PAGE_SIZE]
+        next_page_query = filters_query.copy()
+        next_page_query['cursor'] = make_orders_cursor(orders[-1])
+        next_page_url = f'{request.path}?{next_page_query.urlencode()}'
+
+    context = {
+        'orders': orders,
+        'filters_form': filters_form,
+        'next_page_url': next_page_url,
+        'board_url': request.get_full_path(),
+        'refresh_batch_size': ORDERS_PAGE_SIZE,
+    }
 
-            if order_distance:
-                restaurant.order_distance = order_distance
-                order.restaurants.append(restaurant)
+    return render(request, template_name='order_items.html', context=context)
 
-    Address.objects.bulk_create(addresses_to_create)
-    context = {'orders': [serialize_order(order) for order in orders]}
 
-    return render(request, template_name='order_items.html', context=context)
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def stream_orders_events(request):
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if last_event_id.isdigit():
+        last_event_id = int(last_event_id)
+    else:
+        last_event_id = get_last_event_id()
+
+    response = StreamingHttpResponse(
+        iter_orders_events_stream(last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
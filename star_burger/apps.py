@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class StarBurgerConfig(AppConfig):
+    name = 'star_burger'
+
+    def ready(self):
+        from . import checks  # noqa: F401
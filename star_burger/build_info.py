@@ -0,0 +1,20 @@
+import json
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def read_build_info(path):
+    try:
+        with open(path, encoding='utf-8') as build_info_file:
+            return json.load(build_info_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_build_info(path):
+    build_info = read_build_info(path)
+    return {
+        'branch': os.getenv('BUILD_BRANCH') or build_info.get('branch'),
+        'revision': os.getenv('BUILD_REVISION') or build_info.get('revision'),
+    }
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+@register(Tags.security, deploy=True)
+def check_debug_components(app_configs, **kwargs):
+    errors = []
+    if settings.DEBUG:
+        errors.append(Error(
+            'DEBUG включён',
+            hint='Поставьте DEBUG=False и SETTINGS_PROFILE=prod',
+            id='star_burger.E001',
+        ))
+    for app in settings.DEBUG_ONLY_APPS:
+        if app in settings.INSTALLED_APPS:
+            errors.append(Error(
+                f'Отладочное приложение {app} есть в INSTALLED_APPS',
+                hint='Поставьте SETTINGS_PROFILE=prod',
+                id='star_burger.E002',
+            ))
+    for middleware in settings.DEBUG_ONLY_MIDDLEWARE:
+        if middleware in settings.MIDDLEWARE:
+            errors.append(Error(
+                f'Отладочный middleware {middleware} есть в MIDDLEWARE',
+                hint='Поставьте SETTINGS_PROFILE=prod',
+                id='star_burger.E003',
+            ))
+    return errors
+
+
+@register(Tags.templates, deploy=True)
+def check_cached_template_loaders(app_configs, **kwargs):
+    return [
+        Warning(
+            f'Шаблоны движка {engine.name} не кешируются и читаются с диска на каждый запрос',
+            hint='Поставьте SETTINGS_PROFILE=prod',
+            id='star_burger.W004',
+        )
+        for engine in engines.all()
+        if isinstance(engine, DjangoTemplates)
+        and not any(isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders)
+    ]
+
+
+@register(Tags.database, deploy=True)
+def check_persistent_connections(app_configs, databases=None, **kwargs):
+    return [
+        Warning(
+            f'Соединение с базой {alias} открывается заново на каждый запрос',
+            hint='Поставьте SETTINGS_PROFILE=prod или задайте DB_CONN_MAX_AGE',
+            id='star_burger.W005',
+        )
+        for alias in connections
+        if not connections.databases[alias].get('CONN_MAX_AGE')
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if not isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return []
+    return [Error(
+        'Кеш по умолчанию не общий для процессов: события страницы заказов и версии каталога не дойдут до других воркеров',
+        hint='Задайте CACHE_URL, например redis://127.0.0.1:6379/1',
+        id='star_burger.E006',
+    )]
@@ -0,0 +1,129 @@
+import logging
+import queue
+import sys
+import threading
+import time
+
+import rollbar
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.http import Http404
+from rollbar.contrib.django.middleware import RollbarNotifierMiddlewareExcluding404
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorReporter:
+    def __init__(self, queue_size, dedup_window):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dedup_window = dedup_window
+        self.last_reported_at = {}
+        self.suppressed_count = 0
+        self.dropped_count = 0
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def report_message(self, message, level='error', extra_data=None):
+        return self.submit(
+            ('message', level, message),
+            rollbar.report_message, message, level, extra_data=extra_data,
+        )
+
+    def report_exc_info(self, exc_info, request_data=None, **kwargs):
+        exc_type, exc_value, _ = exc_info
+        payload_data = kwargs.pop('payload_data', None) or {}
+        if request_data:
+            payload_data = {**payload_data, **request_data}
+        return self.submit(
+            ('exception', exc_type, str(exc_value)),
+            rollbar.report_exc_info, exc_info, None, payload_data=payload_data, **kwargs,
+        )
+
+    def is_duplicate(self, key, now):
+        reported_at = self.last_reported_at.get(key)
+        return reported_at is not None and now - reported_at < self.dedup_window
+
+    def remember(self, key, now):
+        if len(self.last_reported_at) >= self.queue.maxsize:
+            self.last_reported_at = {
+                key: reported_at for key, reported_at in self.last_reported_at.items()
+                if now - reported_at < self.dedup_window
+            }
+        self.last_reported_at[key] = now
+
+    def submit(self, key, report, *args, **kwargs):
+        self.ensure_worker()
+        now = time.monotonic()
+        with self.lock:
+            if self.is_duplicate(key, now):
+                self.suppressed_count += 1
+                return False
+            try:
+                self.queue.put_nowait((report, args, kwargs))
+            except queue.Full:
+                self.dropped_count += 1
+                return False
+            self.remember(key, now)
+        return True
+
+    def ensure_worker(self):
+        if self.worker and self.worker.is_alive():
+            return
+        with self.lock:
+            if self.worker and self.worker.is_alive():
+                return
+            self.worker = threading.Thread(target=self.run, name='error-reporter', daemon=True)
+            self.worker.start()
+
+    def run(self):
+        while True:
+            report, args, kwargs = self.queue.get()
+            try:
+                report(*args, **kwargs)
+            except Exception:
+                logger.exception('Не удалось отправить отчёт об ошибке')
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+
+error_reporter = ErrorReporter(
+    queue_size=settings.ERROR_REPORTING_QUEUE_SIZE,
+    dedup_window=settings.ERROR_REPORTING_DEDUP_WINDOW,
+)
+
+
+def get_request_data(request):
+    try:
+        url = request.build_absolute_uri()
+    except DisallowedHost:
+        url = request.get_full_path()
+
+    request_data = {
+        'request': {
+            'url': url,
+            'method': request.method,
+            'headers': dict(request.headers),
+            'GET': request.GET.dict(),
+            'user_ip': request.META.get('REMOTE_ADDR'),
+        },
+    }
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        request_data['person'] = {'id': str(user.pk), 'username': user.get_username()}
+    return request_data
+
+
+class RollbarNotifierMiddleware(RollbarNotifierMiddlewareExcluding404):
+    def process_exception(self, request, exc):
+        if isinstance(exc, Http404):
+            return super().process_exception(request, exc)
+
+        error_reporter.report_exc_info(
+            sys.exc_info(),
+            get_request_data(request),
+            extra_data=self.get_extra_data(request, exc),
+            payload_data=self.get_payload_data(request, exc),
+        )
@@ -0,0 +1,152 @@
+import bisect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200]
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+
+    def serialize(self):
+        labels = [f'<={bucket}' for bucket in self.buckets] + [f'>{self.buckets[-1]}']
+        return dict(zip(labels, self.counts))
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests_count = 0
+        self.total_time_ms = 0
+        self.total_db_time_ms = 0
+        self.total_queries = 0
+        self.max_queries = 0
+        self.time_histogram = Histogram(TIME_BUCKETS_MS)
+        self.queries_histogram = Histogram(QUERY_BUCKETS)
+
+    def add(self, time_ms, db_time_ms, queries_count):
+        self.requests_count += 1
+        self.total_time_ms += time_ms
+        self.total_db_time_ms += db_time_ms
+        self.total_queries += queries_count
+        self.max_queries = max(self.max_queries, queries_count)
+        self.time_histogram.add(time_ms)
+        self.queries_histogram.add(queries_count)
+
+    def serialize(self):
+        return {
+            'requests': self.requests_count,
+            'avg_time_ms': round(self.total_time_ms / self.requests_count, 2),
+            'avg_db_time_ms': round(self.total_db_time_ms / self.requests_count, 2),
+            'avg_queries': round(self.total_queries / self.requests_count, 2),
+            'max_queries': self.max_queries,
+            'time_ms': self.time_histogram.serialize(),
+            'queries': self.queries_histogram.serialize(),
+        }
+
+
+class PerformanceStats:
+    def __init__(self):
+        self.views = {}
+        self.lock = threading.Lock()
+
+    def add(self, view_name, time_ms, db_time_ms, queries_count):
+        with self.lock:
+            self.views.setdefault(view_name, ViewStats()).add(time_ms, db_time_ms, queries_count)
+
+    def serialize(self):
+        with self.lock:
+            return {view_name: stats.serialize() for view_name, stats in sorted(self.views.items())}
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+
+performance_stats = PerformanceStats()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries_count = 0
+        self.db_time = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started_at
+            self.queries_count += 1
+
+
+def get_view_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    if not resolver_match:
+        return None
+
+    view = getattr(resolver_match.func, 'cls', resolver_match.func)
+    # @api_view names its generated class after the function, but leaves the nested qualname
+    qualname = view.__name__ if '<locals>' in view.__qualname__ else view.__qualname__
+    return f'{view.__module__}.{qualname}'
+
+
+def check_query_budget(view_name, queries_count):
+    budget = settings.PERFORMANCE_QUERY_BUDGETS.get(view_name)
+    if budget is None or queries_count <= budget:
+        return
+
+    message = f'{view_name} выполнил {queries_count} SQL-запросов при бюджете {budget}'
+    if settings.PERFORMANCE_QUERY_BUDGET_MODE == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_MONITORING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_counter = QueryCounter()
+        started_at = time.perf_counter()
+        with connection.execute_wrapper(query_counter):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started_at
+
+        view_name = get_view_name(request)
+        if view_name:
+            performance_stats.add(
+                view_name,
+                time_ms=elapsed * 1000,
+                db_time_ms=query_counter.db_time * 1000,
+                queries_count=query_counter.queries_count,
+            )
+            check_query_budget(view_name, query_counter.queries_count)
+        return response
+
+
+@staff_member_required
+def performance_stats_api(request):
+    return JsonResponse(performance_stats.serialize(), json_dumps_params={
+        'ensure_ascii': False,
+    })
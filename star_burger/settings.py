@@ -1,8 +1,11 @@
 import os
+import sys
 import dj_database_url
 import rollbar
+from django.core.exceptions import ImproperlyConfigured
 from environs import Env
-from git import Repo
+
+from .build_info import get_build_info
 
 
 env = Env()
@@ -12,13 +15,30 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 YANDEX_APIKEY = env('YANDEX_API_KEY')
+YANDEX_GEOCODER_URL = env('YANDEX_GEOCODER_URL', 'https://geocode-maps.yandex.ru/1.x')
+YANDEX_GEOCODER_TIMEOUT = env.float('YANDEX_GEOCODER_TIMEOUT', 5)
+GEOCODER_WORKERS = env.int('GEOCODER_WORKERS', 8)
+GEOCODER_RETRY_TTL = env.int('GEOCODER_RETRY_TTL', 60 * 60)
+GEOCODER_CACHE_TTL = env.int('GEOCODER_CACHE_TTL', 0)
+DISTANCE_MODE = env('DISTANCE_MODE', 'haversine')
+PRODUCT_AVAILABILITY_STRATEGY = env('PRODUCT_AVAILABILITY_STRATEGY', 'exists')
+ORDER_EVENTS_POLL_INTERVAL = env.float('ORDER_EVENTS_POLL_INTERVAL', 1)
+ORDER_EVENTS_STREAM_DURATION = env.int('ORDER_EVENTS_STREAM_DURATION', 5 * 60)
+
+RUNNING_TESTS = sys.argv[1:2] == ['test']
+
+SETTINGS_PROFILES = ['dev', 'prod', 'bench']
+SETTINGS_PROFILE = env('SETTINGS_PROFILE', 'dev')
+if SETTINGS_PROFILE not in SETTINGS_PROFILES:
+    raise ImproperlyConfigured(f'SETTINGS_PROFILE must be one of {", ".join(SETTINGS_PROFILES)}')
 
 SECRET_KEY = env('SECRET_KEY')
-DEBUG = env.bool('DEBUG', True)
+DEBUG = env.bool('DEBUG', SETTINGS_PROFILE == 'dev')
 
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', ['127.0.0.1', 'localhost'])
 
 INSTALLED_APPS = [
+    'star_burger.apps.StarBurgerConfig',
     'foodcartapp.apps.FoodcartappConfig',
     'restaurateur.apps.RestaurateurConfig',
     'django.contrib.admin',
@@ -29,12 +49,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'phonenumber_field',
     'rest_framework',
-    'debug_toolbar',
 
     'geo_places.apps.GeoPlacesConfig',
 ]
 
 MIDDLEWARE = [
+    'star_burger.performance.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,12 +62,26 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-    'rollbar.contrib.django.middleware.RollbarNotifierMiddlewareExcluding404'
+    'star_burger.error_reporting.RollbarNotifierMiddleware'
 ]
 
+DEBUG_ONLY_APPS = ['debug_toolbar']
+DEBUG_ONLY_MIDDLEWARE = ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+if SETTINGS_PROFILE == 'dev':
+    INSTALLED_APPS += DEBUG_ONLY_APPS
+    MIDDLEWARE.insert(MIDDLEWARE.index('star_burger.error_reporting.RollbarNotifierMiddleware'), *DEBUG_ONLY_MIDDLEWARE)
+
 ROOT_URLCONF = 'star_burger.urls'
 
+PERFORMANCE_MONITORING = env.bool('PERFORMANCE_MONITORING', SETTINGS_PROFILE == 'bench' or RUNNING_TESTS)
+PERFORMANCE_QUERY_BUDGETS = env.dict('PERFORMANCE_QUERY_BUDGETS', subcast_values=int, default={
+    'foodcartapp.views.product_list_api': 5,
+    'foodcartapp.views.register_order': 10,
+    'restaurateur.views.view_orders': 15,
+})
+PERFORMANCE_QUERY_BUDGET_MODE = env('PERFORMANCE_QUERY_BUDGET_MODE', 'raise' if RUNNING_TESTS else 'warn')
+
 DEBUG_TOOLBAR_PANELS = [
     'debug_toolbar.panels.versions.VersionsPanel',
     'debug_toolbar.panels.timer.TimerPanel',
@@ -63,13 +97,19 @@ DEBUG_TOOLBAR_PANELS = [
     'debug_toolbar.panels.redirects.RedirectsPanel',
 ]
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if SETTINGS_PROFILE != 'dev':
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [
             os.path.join(BASE_DIR, "templates"),
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -77,6 +117,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
@@ -86,11 +127,23 @@ WSGI_APPLICATION = 'star_burger.wsgi.application'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+TEST_RUNNER = 'star_burger.test_runner.TestRunner'
+
 db_url = env('DB_URL')
 
 DATABASES = {
-    'default': dj_database_url.parse(db_url, conn_max_age=600)
+    'default': dj_database_url.parse(
+        db_url,
+        conn_max_age=env.int('DB_CONN_MAX_AGE', 0 if SETTINGS_PROFILE == 'dev' else 600),
+    )
+}
+
+CACHES = {
+    'default': env.dj_cache_url('CACHE_URL', 'locmem://'),
 }
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.redis.RedisCache':
+    # django-cache-url maps redis:// to the backend of Django 4.0, Django 3.2 uses django-redis instead
+    CACHES['default']['BACKEND'] = 'django_redis.cache.RedisCache'
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -124,19 +177,29 @@ INTERNAL_IPS = [
 ]
 
 
+if SETTINGS_PROFILE == 'prod':
+    STATICFILES_STORAGE = 'star_burger.storage.CompressedManifestStaticFilesStorage'
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "assets"),
     os.path.join(BASE_DIR, "bundles"),
 ]
 
-local_repo = Repo(path=BASE_DIR)
-local_branch = local_repo.active_branch.name
+BUILD_INFO = get_build_info(os.path.join(BASE_DIR, 'build_info.json'))
 
 ROLLBAR = {
     'access_token': env('ROLLBAR_TOKEN'),
     'environment': env('ROLLBAR_ENV', 'production'),
     'root': BASE_DIR,
-    'branch': local_branch
+    'branch': BUILD_INFO['branch'],
+    'code_version': BUILD_INFO['revision'],
+    'endpoint': env('ROLLBAR_ENDPOINT', 'https://api.rollbar.com/api/1/'),
+    'enabled': env.bool('ROLLBAR_ENABLED', not RUNNING_TESTS),
+    # reports are sent only from the error_reporter thread, so it sends them itself
+    'handler': 'blocking',
 }
 
+ERROR_REPORTING_QUEUE_SIZE = env.int('ERROR_REPORTING_QUEUE_SIZE', 1000)
+ERROR_REPORTING_DEDUP_WINDOW = env.int('ERROR_REPORTING_DEDUP_WINDOW', 60)
+
 rollbar.init(**ROLLBAR)
@@ -0,0 +1,168 @@
+import json
+import sys
+from unittest import mock
+
+import rollbar
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+
+from foodcartapp.models import Order, OrderItem, Product, Restaurant, RestaurantMenuItem
+from star_burger.error_reporting import ErrorReporter, get_request_data
+from star_burger.performance import QueryBudgetExceeded, get_view_name
+from star_burger.testing import StubHandler, start_stub_server
+
+
+class FakeRollbarHandler(StubHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.items.append((self.path, json.loads(body)))
+        self.send_json({'err': 0, 'result': {'uuid': str(len(self.server.items))}})
+
+
+class FakeRollbarMixin:
+    def setUp(self):
+        super().setUp()
+        self.server = start_stub_server(self, FakeRollbarHandler)
+        self.server.items = []
+
+        endpoint = f'http://127.0.0.1:{self.server.server_port}/api/1/'
+        settings_patcher = mock.patch.dict(rollbar.SETTINGS, {'endpoint': endpoint, 'enabled': True})
+        settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+
+
+class ErrorReporterTest(FakeRollbarMixin, SimpleTestCase):
+    def test_sends_message(self):
+        reporter = ErrorReporter(queue_size=10, dedup_window=60)
+        self.assertTrue(reporter.report_message('Geocoder is down', 'warning', extra_data={'address': 'Москва'}))
+        reporter.flush()
+
+        path, item = self.server.items[0]
+        self.assertEqual(path, '/api/1/item/')
+        self.assertEqual(item['data']['body']['message']['body'], 'Geocoder is down')
+        self.assertEqual(item['data']['level'], 'warning')
+        self.assertEqual(item['data']['body']['message']['address'], 'Москва')
+
+    def test_sends_exception_with_request_snapshot(self):
+        reporter = ErrorReporter(queue_size=10, dedup_window=60)
+        request = RequestFactory().get('/api/products/', {'limit': 10}, HTTP_HOST='localhost')
+        try:
+            raise ValueError('broken')
+        except ValueError:
+            reporter.report_exc_info(sys.exc_info(), get_request_data(request))
+        reporter.flush()
+
+        _, item = self.server.items[0]
+        self.assertEqual(item['data']['body']['trace']['exception']['class'], 'ValueError')
+        self.assertEqual(item['data']['request']['url'], 'http://localhost/api/products/?limit=10')
+        self.assertEqual(item['data']['request']['GET'], {'limit': '10'})
+
+    def test_suppresses_duplicates_within_window(self):
+        reporter = ErrorReporter(queue_size=10, dedup_window=60)
+        self.assertTrue(reporter.report_message('Geocoder is down'))
+        self.assertFalse(reporter.report_message('Geocoder is down'))
+        reporter.flush()
+
+        self.assertEqual(len(self.server.items), 1)
+        self.assertEqual(reporter.suppressed_count, 1)
+
+    def test_dropped_report_is_not_suppressed(self):
+        reporter = ErrorReporter(queue_size=1, dedup_window=60)
+        with mock.patch.object(reporter, 'ensure_worker'):
+            reporter.queue.put_nowait((print, (), {}))
+            self.assertFalse(reporter.report_message('Geocoder is down'))
+        self.assertEqual(reporter.dropped_count, 1)
+
+        reporter.queue.get_nowait()
+        reporter.queue.task_done()
+        self.assertTrue(reporter.report_message('Geocoder is down'))
+        reporter.flush()
+        self.assertEqual(len(self.server.items), 1)
+
+    def test_sends_from_reporter_thread_without_extra_threads(self):
+        reporter = ErrorReporter(queue_size=10, dedup_window=60)
+        with mock.patch('rollbar._send_payload_thread') as send_payload_thread:
+            reporter.report_message('Geocoder is down')
+            reporter.flush()
+
+        send_payload_thread.assert_not_called()
+        self.assertEqual(len(self.server.items), 1)
+
+
+class DisabledReportingTest(SimpleTestCase):
+    def test_reporting_is_disabled_in_tests(self):
+        self.assertFalse(rollbar.SETTINGS['enabled'])
+        with mock.patch('rollbar._send_payload') as send_payload:
+            self.assertIsNone(rollbar.report_message('Geocoder is down'))
+        send_payload.assert_not_called()
+
+
+class RequestDataTest(TestCase):
+    def test_snapshot_is_plain_data(self):
+        request = RequestFactory().get('/manager/orders/', HTTP_HOST='localhost')
+        request.user = User.objects.create_user('manager')
+
+        request_data = get_request_data(request)
+
+        self.assertEqual(request_data['person'], {'id': str(request.user.pk), 'username': 'manager'})
+        self.assertEqual(request_data['request']['method'], 'GET')
+        json.dumps(request_data)
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager', is_staff=True)
+        restaurant = Restaurant.objects.create(name='Star Burger Арбат', address='Москва, Арбат 15')
+        product = Product.objects.create(name='Чизбургер', price=100, image='burger.jpg')
+        RestaurantMenuItem.objects.create(restaurant=restaurant, product=product)
+        for number in range(20):
+            order = Order.objects.create(
+                firstname='Иван',
+                lastname='Иванов',
+                phonenumber='+79291000000',
+                address=f'Москва, Тверская {number}',
+            )
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_view_names_include_module(self):
+        self.assertEqual(get_view_name(RequestFactory().get('/')), None)
+        for url, view_name in [
+            ('/api/products/', 'foodcartapp.views.product_list_api'),
+            ('/manager/orders/', 'restaurateur.views.view_orders'),
+            ('/manager/login/', 'restaurateur.views.LoginView'),
+        ]:
+            request = RequestFactory().get(url)
+            request.resolver_match = resolve(url)
+            self.assertEqual(get_view_name(request), view_name)
+
+    def test_tests_fail_on_exceeded_budget(self):
+        self.assertEqual(settings.PERFORMANCE_QUERY_BUDGET_MODE, 'raise')
+        with override_settings(PERFORMANCE_QUERY_BUDGETS={'restaurateur.views.view_orders': 1}), \
+                self.assertLogs('django.request', 'ERROR'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/manager/orders/')
+
+    def test_warns_on_exceeded_budget(self):
+        budgets = {'restaurateur.views.view_orders': 1}
+        with override_settings(PERFORMANCE_QUERY_BUDGETS=budgets, PERFORMANCE_QUERY_BUDGET_MODE='warn'):
+            with self.assertLogs('star_burger.performance', 'WARNING'):
+                response = self.client.get('/manager/orders/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_views_fit_default_budgets(self):
+        self.assertEqual(self.client.get('/manager/orders/').status_code, 200)
+        self.assertEqual(self.client.get('/api/products/').status_code, 200)
+        response = self.client.post('/api/order/', {
+            'firstname': 'Иван',
+            'lastname': 'Иванов',
+            'phonenumber': '+79291000000',
+            'address': 'Москва, Тверская 1',
+            'products': [{'product': Product.objects.get().id, 'quantity': 2}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
@@ -20,6 +20,7 @@ from django.urls import path, include
 from django.shortcuts import render
 
 from . import settings
+from .performance import performance_stats_api
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,9 +28,10 @@ urlpatterns = [
     path('api/', include('foodcartapp.urls')),
     path('manager/', include('restaurateur.urls')),
     path('api/', include('rest_framework.urls')),
+    path('internal/performance/', performance_stats_api, name='performance_stats'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns = [
         path(r'__debug__/', include(debug_toolbar.urls)),